@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+# Pixels de largura por ponto desenhado: abaixo disso os pontos se sobrepõem
+PIXELS_POR_PONTO = 2
+
+
+def pontos_para_largura(largura_px, pixels_por_ponto=PIXELS_POR_PONTO):
+    """Máximo de pontos que vale a pena enviar para um gráfico com essa largura"""
+    return max(3, int(largura_px // pixels_por_ponto))
+
+
+def lttb(x, y, max_pontos):
+    """Largest-Triangle-Three-Buckets: índices dos pontos que preservam a forma da série.
+
+    x e y são arrays numéricos do mesmo tamanho, com x em ordem crescente.
+    Mantém o primeiro e o último ponto (com max_pontos >= 2).
+    """
+    n = len(y)
+    if max_pontos >= n:
+        return np.arange(n)
+    if max_pontos < 3:
+        # Sem espaço para buckets: só as pontas que couberem
+        return np.array([0, n - 1][:max(max_pontos, 0)], dtype='int64')
+
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+
+    # Bordas dos buckets (o primeiro e o último ponto ficam fora deles)
+    bordas = np.linspace(1, n - 1, max_pontos - 1).astype('int64')
+    indices = np.empty(max_pontos, dtype='int64')
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    anterior = 0
+    for i in range(max_pontos - 2):
+        inicio, fim = bordas[i], bordas[i + 1]
+        # Média do próximo bucket (ou o último ponto)
+        prox_inicio, prox_fim = fim, bordas[i + 2] if i + 2 < len(bordas) else n
+        media_x = x[prox_inicio:prox_fim].mean()
+        media_y = y[prox_inicio:prox_fim].mean()
+
+        # Ponto do bucket que forma o maior triângulo com o anterior e a média seguinte
+        areas = np.abs(
+            (x[anterior] - media_x) * (y[inicio:fim] - y[anterior])
+            - (x[anterior] - x[inicio:fim]) * (media_y - y[anterior])
+        )
+        anterior = inicio + int(areas.argmax())
+        indices[i + 1] = anterior
+
+    return indices
+
+
+def indices_cruzamentos(y, limites, max_cruzamentos=None):
+    """Índices dos pontos imediatamente antes/depois de cada cruzamento de um limite.
+
+    Com max_cruzamentos, a série é dividida nesse número de faixas e só o
+    primeiro cruzamento de cada faixa é mantido (no máximo 2 * max_cruzamentos índices).
+    """
+    y = np.asarray(y, dtype='float64')
+    if len(y) < 2:
+        return np.arange(len(y))
+
+    mudancas = []
+    for limite in limites:
+        lado = np.sign(y - limite)
+        mudancas.append(np.nonzero(lado[1:] != lado[:-1])[0])
+    if not mudancas:
+        return np.array([], dtype='int64')
+    mudou = np.unique(np.concatenate(mudancas))
+
+    if max_cruzamentos is not None and len(mudou) > max_cruzamentos:
+        if max_cruzamentos < 1:
+            return np.array([], dtype='int64')
+        faixas = mudou * max_cruzamentos // (len(y) - 1)
+        _, primeiros = np.unique(faixas, return_index=True)
+        mudou = mudou[primeiros]
+
+    return np.unique(np.concatenate([mudou, mudou + 1]))
+
+
+def reduzir_serie(df, coluna_x, coluna_y, max_pontos, limites=()):
+    """Reduz um DataFrame de série temporal a no máximo max_pontos linhas.
+
+    Usa LTTB para a forma geral e mantém os pontos em volta dos cruzamentos dos
+    limites (ex: estoque_min/estoque_max), um por faixa da série, usando no
+    máximo metade dos pontos.
+    """
+    if len(df) <= max_pontos:
+        return df
+
+    if pd.api.types.is_numeric_dtype(df[coluna_x]):
+        x = df[coluna_x].to_numpy()
+    else:
+        x = pd.to_datetime(df[coluna_x]).to_numpy().astype('int64')
+    y = df[coluna_y].to_numpy()
+
+    # Cada cruzamento ocupa 2 pontos; o LTTB fica com pelo menos 3
+    cruzamentos = indices_cruzamentos(y, limites, max_cruzamentos=(max_pontos - 3) // 4)
+    orcamento = max_pontos - len(cruzamentos)
+    indices = np.union1d(lttb(x, y, orcamento), cruzamentos)
+    return df.iloc[indices]
@@ -0,0 +1,336 @@
+import argparse
+import gzip
+import json
+import traceback
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock
+from urllib.parse import parse_qs, urlparse
+
+from estoque_db import EstoqueDB
+from multi_deposito import DIRETORIO_DEPOSITOS, EstoqueMultiDeposito, depositos_configurados
+
+# Limites de paginação
+POR_PAGINA_PADRAO = 100
+POR_PAGINA_MAX = 1000
+
+# Janela máxima do histórico (dias)
+DIAS_HISTORICO_MAX = 365
+
+# Maior quantidade aceita numa movimentação (INTEGER do SQLite vai até 2**63 - 1)
+QUANTIDADE_MAX = 1_000_000_000
+
+# Respostas menores que isso não compensam comprimir
+GZIP_MIN_BYTES = 1024
+
+# Respostas GET já serializadas, por (caminho, query, versão dos dados)
+CACHE_MAX_RESPOSTAS = 256
+
+
+class CacheRespostas:
+    """LRU simples das respostas GET; entradas de versões antigas saem naturalmente"""
+
+    def __init__(self, tamanho_max=CACHE_MAX_RESPOSTAS):
+        self.tamanho_max = tamanho_max
+        self.itens = OrderedDict()
+        self.lock = Lock()
+
+    def obter(self, chave):
+        with self.lock:
+            if chave in self.itens:
+                self.itens.move_to_end(chave)
+                return self.itens[chave]
+        return None
+
+    def guardar(self, chave, valor):
+        with self.lock:
+            self.itens[chave] = valor
+            self.itens.move_to_end(chave)
+            while len(self.itens) > self.tamanho_max:
+                self.itens.popitem(last=False)
+
+
+def _json_default(obj):
+    # Tipos numpy (int64, float64) vindos dos DataFrames
+    if hasattr(obj, 'item'):
+        return obj.item()
+    return str(obj)
+
+
+def serializar(dados):
+    return json.dumps(dados, ensure_ascii=False, default=_json_default).encode('utf-8')
+
+
+def _inteiro(query, nome, padrao, minimo=None, maximo=None):
+    try:
+        valor = int(query.get(nome, [padrao])[0])
+    except (TypeError, ValueError):
+        raise ValueError(f"Parâmetro '{nome}' deve ser um número inteiro")
+    if minimo is not None and valor < minimo:
+        raise ValueError(f"Parâmetro '{nome}' deve ser >= {minimo}")
+    if maximo is not None:
+        valor = min(valor, maximo)
+    return valor
+
+
+def _quantidade(valor):
+    # Só inteiros (ou 5.0): 1.9, "5" e true não são aceitos
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    if isinstance(valor, bool) or not isinstance(valor, int):
+        raise ValueError("Campo 'quantidade' deve ser um número inteiro")
+    if not 0 < valor <= QUANTIDADE_MAX:
+        raise ValueError(f"Campo 'quantidade' deve estar entre 1 e {QUANTIDADE_MAX}")
+    return valor
+
+
+def _texto(corpo, nome, obrigatorio=True):
+    # Campos de texto do JSON: listas, números e objetos viram 400, não erro do SQLite
+    valor = corpo.get(nome)
+    if valor is None and not obrigatorio:
+        return ''
+    if not isinstance(valor, str) or (obrigatorio and not valor.strip()):
+        raise ValueError(f"Campo '{nome}' deve ser um texto" + (" não vazio" if obrigatorio else ""))
+    return valor
+
+
+def _validar_movimentacao(mov):
+    if not isinstance(mov, dict):
+        raise ValueError("Movimentação deve ser um objeto JSON")
+    return {
+        'codigo': _texto(mov, 'codigo'),
+        'tipo': _texto(mov, 'tipo'),
+        'quantidade': _quantidade(mov.get('quantidade')),
+        'motivo': _texto(mov, 'motivo', obrigatorio=False),
+    }
+
+
+class EstoqueAPI:
+    """Rotas da API sobre um EstoqueDB ou EstoqueMultiDeposito; independente do servidor HTTP.
+
+    Com vários depósitos, ?deposito=<local> escolhe o banco do depósito; sem ele,
+    as leituras usam a visão consolidada e as escritas são recusadas.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.multi = isinstance(db, EstoqueMultiDeposito)
+        self.cache = CacheRespostas()
+
+    def _banco(self, query, escrita=False):
+        local = query.get('deposito', [None])[0]
+        if not self.multi:
+            if local:
+                raise ValueError("Servidor sem depósitos configurados (ESTOQUE_DEPOSITOS)")
+            return self.db
+        if local:
+            return self.db.deposito(local)
+        if escrita:
+            raise ValueError(f"Informe o depósito (?deposito=): {', '.join(self.db.locais)}")
+        return self.db
+
+    # GET /depositos
+    def get_depositos(self, query):
+        return {'depositos': self.db.locais if self.multi else []}
+
+    # GET /produtos?pagina=1&por_pagina=100&deposito=central
+    def get_produtos(self, query):
+        banco = self._banco(query)
+        pagina = _inteiro(query, 'pagina', 1, minimo=1)
+        por_pagina = _inteiro(query, 'por_pagina', POR_PAGINA_PADRAO, minimo=1, maximo=POR_PAGINA_MAX)
+        offset = (pagina - 1) * por_pagina
+        if banco is self.db and self.multi:
+            # Visão consolidada: soma dos depósitos, paginada depois de consolidar
+            consolidado = banco.obter_produtos()
+            df, total = consolidado.iloc[offset:offset + por_pagina], len(consolidado)
+        else:
+            df = banco.obter_produtos(limite=por_pagina, offset=offset)
+            total = sum(banco.obter_contadores_status().values())
+        return {
+            'deposito': query.get('deposito', [None])[0],
+            'pagina': pagina,
+            'por_pagina': por_pagina,
+            'total': total,
+            'produtos': df.to_dict('records'),
+        }
+
+    # GET /historico?codigo=P001&dias=30&pagina=1&por_pagina=100&deposito=central
+    def get_historico(self, query):
+        banco = self._banco(query)
+        codigo = query.get('codigo', [None])[0]
+        dias = _inteiro(query, 'dias', 30, minimo=1, maximo=DIAS_HISTORICO_MAX)
+        pagina = _inteiro(query, 'pagina', 1, minimo=1)
+        por_pagina = _inteiro(query, 'por_pagina', POR_PAGINA_PADRAO, minimo=1, maximo=POR_PAGINA_MAX)
+        # Uma linha a mais indica se existe próxima página, sem contar o período inteiro
+        df = banco.obter_historico(codigo, dias, limite=por_pagina + 1, offset=(pagina - 1) * por_pagina)
+        return {
+            'deposito': query.get('deposito', [None])[0],
+            'codigo': codigo,
+            'dias': dias,
+            'pagina': pagina,
+            'por_pagina': por_pagina,
+            'tem_mais': len(df) > por_pagina,
+            'historico': df.head(por_pagina).to_dict('records'),
+        }
+
+    # POST /movimentacoes?deposito=central
+    def post_movimentacao(self, query, corpo):
+        banco = self._banco(query, escrita=True)
+        mov = _validar_movimentacao(corpo)
+        saldo = banco.registrar_movimentacoes([mov], usuario='api')[0]
+        return {'codigo': mov['codigo'], 'saldo_atual': saldo}
+
+    # POST /movimentacoes/lote?deposito=central (atômico dentro do depósito)
+    def post_movimentacoes_lote(self, query, corpo):
+        banco = self._banco(query, escrita=True)
+        if not isinstance(corpo, list):
+            raise ValueError("O corpo deve ser uma lista de movimentações")
+        movs = [_validar_movimentacao(mov) for mov in corpo]
+        saldos = banco.registrar_movimentacoes(movs, usuario='api')
+        return {
+            'registradas': len(saldos),
+            'saldos': [{'codigo': mov['codigo'], 'saldo_atual': saldo} for mov, saldo in zip(movs, saldos)],
+        }
+
+    # POST /transferencias {"codigo", "origem", "destino", "quantidade", "motivo"}
+    def post_transferencia(self, query, corpo):
+        if not self.multi:
+            raise ValueError("Servidor sem depósitos configurados (ESTOQUE_DEPOSITOS)")
+        if not isinstance(corpo, dict):
+            raise ValueError("Transferência deve ser um objeto JSON")
+        transferencia = {nome: _texto(corpo, nome) for nome in ('codigo', 'origem', 'destino')}
+        transferencia['quantidade'] = _quantidade(corpo.get('quantidade'))
+        self.db.transferir(
+            transferencia['codigo'], transferencia['origem'], transferencia['destino'],
+            transferencia['quantidade'], _texto(corpo, 'motivo', obrigatorio=False), usuario='api'
+        )
+        return transferencia
+
+    def rotas_get(self):
+        return {'/produtos': self.get_produtos, '/historico': self.get_historico, '/depositos': self.get_depositos}
+
+    def rotas_post(self):
+        return {
+            '/movimentacoes': self.post_movimentacao,
+            '/movimentacoes/lote': self.post_movimentacoes_lote,
+            '/transferencias': self.post_transferencia,
+        }
+
+
+def criar_handler(api):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def _responder(self, status, corpo, etag=None, gzip_corpo=None):
+            usar_gzip = gzip_corpo is not None and 'gzip' in self.headers.get('Accept-Encoding', '')
+            dados = gzip_corpo if usar_gzip else corpo
+
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(dados)))
+            self.send_header('Vary', 'Accept-Encoding')
+            if etag:
+                self.send_header('ETag', etag)
+                self.send_header('Cache-Control', 'no-cache')
+            if usar_gzip:
+                self.send_header('Content-Encoding', 'gzip')
+            self.end_headers()
+            self.wfile.write(dados)
+
+        def _responder_vazio(self, status, etag):
+            self.send_response(status)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def _erro(self, status, mensagem):
+            self._responder(status, serializar({'erro': mensagem}))
+
+        def _erro_interno(self):
+            # Detalhes (mensagens do SQLite, caminhos) ficam no log do servidor, não na resposta
+            traceback.print_exc()
+            self._erro(500, "Erro interno do servidor")
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            rota = api.rotas_get().get(url.path.rstrip('/') or '/')
+            if rota is None:
+                return self._erro(404, "Rota não encontrada")
+
+            # ETag = versão dos dados: sem mudanças, nem consulta o banco. Fraca (W/) porque
+            # o mesmo conteúdo sai com ou sem gzip; If-None-Match usa comparação fraca
+            versao = f'"{api.db.versao_dados()}"'
+            etag = f'W/{versao}'
+            if versao in [t.strip().removeprefix('W/') for t in self.headers.get('If-None-Match', '').split(',')]:
+                return self._responder_vazio(304, etag)
+
+            chave = (url.path, url.query, etag)
+            resposta = api.cache.obter(chave)
+            if resposta is None:
+                try:
+                    corpo = serializar(rota(parse_qs(url.query)))
+                except ValueError as e:
+                    return self._erro(400, str(e))
+                except Exception:
+                    return self._erro_interno()
+                comprimido = gzip.compress(corpo, compresslevel=5) if len(corpo) >= GZIP_MIN_BYTES else None
+                resposta = (corpo, comprimido)
+                api.cache.guardar(chave, resposta)
+
+            self._responder(200, resposta[0], etag=etag, gzip_corpo=resposta[1])
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            rota = api.rotas_post().get(url.path.rstrip('/'))
+            if rota is None:
+                return self._erro(404, "Rota não encontrada")
+
+            try:
+                tamanho = int(self.headers.get('Content-Length', 0))
+                corpo = json.loads(self.rfile.read(tamanho) or b'null')
+            except (ValueError, UnicodeDecodeError):
+                return self._erro(400, "JSON inválido")
+
+            try:
+                resultado = rota(parse_qs(url.query), corpo)
+            except ValueError as e:
+                return self._erro(400, str(e))
+            except Exception:
+                return self._erro_interno()
+            self._responder(201, serializar(resultado))
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def criar_servidor(db_path="estoque.db", host="127.0.0.1", porta=8502, depositos=None, diretorio=DIRETORIO_DEPOSITOS):
+    """Servidor HTTP da API; com depósitos (padrão: ESTOQUE_DEPOSITOS) usa um banco por depósito"""
+    depositos = depositos_configurados() if depositos is None else depositos
+    db = EstoqueMultiDeposito(depositos, diretorio) if depositos else EstoqueDB(db_path)
+    return ThreadingHTTPServer((host, porta), criar_handler(EstoqueAPI(db)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API JSON do sistema de estoque")
+    parser.add_argument('--db', default='estoque.db', help="Caminho do banco SQLite")
+    parser.add_argument('--depositos', help="Depósitos separados por vírgula (padrão: ESTOQUE_DEPOSITOS)")
+    parser.add_argument('--diretorio', default=DIRETORIO_DEPOSITOS, help="Diretório dos bancos dos depósitos")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--porta', type=int, default=8502)
+    args = parser.parse_args()
+
+    depositos = None if args.depositos is None else [d.strip() for d in args.depositos.split(',') if d.strip()]
+    servidor = criar_servidor(args.db, args.host, args.porta, depositos, args.diretorio)
+    print(f"🚀 API de estoque em http://{args.host}:{args.porta}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Mede a latência de EstoqueDB.buscar_produtos num catálogo grande gerado na hora.
+
+Uso: python benchmark_busca.py [--produtos N] [--repeticoes N]
+Os termos cobrem a busca enquanto se digita (prefixos de 1 a 3 letras), palavras
+comuns e um código exato.
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+from estoque_db import EstoqueDB
+
+# Meta de latência por busca (ms)
+LATENCIA_ALVO_MS = 10
+
+CATEGORIAS = ['Eletrônicos', 'Roupas', 'Casa', 'Livros', 'Ferramentas']
+NOMES = ['Produto', 'Parafuso', 'Porca', 'Arruela', 'Cabo', 'Camisa', 'Caneca']
+
+
+def gerar_catalogo(db, quantidade):
+    conn = sqlite3.connect(db.db_path)
+    cursor = conn.cursor()
+    db.remover_triggers_busca(cursor)
+    cursor.executemany(
+        '''INSERT INTO produtos (codigo, nome, categoria, estoque_atual, estoque_min, estoque_max, custo_unitario)
+           VALUES (?, ?, ?, 100, 10, 200, 9.9)''',
+        ((f"SKU{i:07d}", f"{NOMES[i % len(NOMES)]} modelo {i}", CATEGORIAS[i % len(CATEGORIAS)])
+         for i in range(quantidade))
+    )
+    db.reconstruir_indice_busca(cursor)
+    conn.commit()
+    conn.close()
+
+
+def tempo_busca(db, termo, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        t = time.perf_counter()
+        db.buscar_produtos(termo)
+        tempos.append(time.perf_counter() - t)
+    return min(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--produtos', type=int, default=1_000_000)
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = EstoqueDB(os.path.join(tmp, 'estoque.db'))
+        print(f"📦 Gerando {args.produtos} produtos...")
+        gerar_catalogo(db, args.produtos)
+
+        print(f"🔎 buscar_produtos (melhor de {args.repeticoes}, meta {LATENCIA_ALVO_MS} ms)")
+        for termo in ['p', 'pa', 'pro', 'produto', 'casa', 'parafuso mod', 'porca modelo', 'SKU0500000', 'xyz']:
+            ms = tempo_busca(db, termo, args.repeticoes) * 1000
+            print(f"  {termo!r:<20} {ms:8.1f} ms {'✅' if ms <= LATENCIA_ALVO_MS else '⚠️'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Mede o tempo de inicialização: imports, abertura do banco e primeira renderização.
+
+Uso: python benchmark_inicializacao.py [--repeticoes N]
+Cada medição de import roda num interpretador novo, como um processo recém-iniciado.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+DIRETORIO = os.path.dirname(os.path.abspath(__file__))
+
+MODULOS = [
+    'pandas',
+    'numpy',
+    'streamlit',
+    'plotly.express',
+    'plotly.graph_objects',
+    'openpyxl',
+    'status_estoque',
+    'estoque_db',
+]
+
+DASHBOARDS = ['dashboard_streamlit.py', 'dashboard_sheets.py']
+
+
+def _rodar(codigo, cwd=None):
+    env = dict(os.environ, PYTHONPATH=DIRETORIO)
+    resultado = subprocess.run(
+        [sys.executable, '-c', codigo], capture_output=True, text=True, cwd=cwd or DIRETORIO, env=env
+    )
+    return _ler_tempos(resultado, 1)
+
+
+def _ler_tempos(resultado, quantidade):
+    """Últimas `quantidade` linhas da saída como floats; None se o processo falhou"""
+    linhas = resultado.stdout.strip().splitlines()
+    if resultado.returncode != 0 or len(linhas) < quantidade:
+        return None
+    try:
+        tempos = [float(linha) for linha in linhas[-quantidade:]]
+    except ValueError:
+        return None
+    return tempos[0] if quantidade == 1 else tuple(tempos)
+
+
+def tempo_import(modulo, repeticoes):
+    codigo = f"import time; t = time.perf_counter(); import {modulo}; print(time.perf_counter() - t)"
+    tempos = [_rodar(codigo) for _ in range(repeticoes)]
+    return None if None in tempos else min(tempos)
+
+
+def tempo_banco(repeticoes):
+    """Abertura do EstoqueDB: banco novo (cria schema) x banco existente (caminho rápido)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        codigo = (
+            "import time; from estoque_db import EstoqueDB; "
+            "t = time.perf_counter(); EstoqueDB('estoque.db'); print(time.perf_counter() - t)"
+        )
+        frio = _rodar(codigo, cwd=tmp)
+        quentes = [_rodar(codigo, cwd=tmp) for _ in range(repeticoes)]
+    if frio is None or None in quentes:
+        return None
+    return frio, min(quentes)
+
+
+def tempo_renderizacao(script):
+    """Execução completa do script via streamlit.testing (primeira e segunda execução)"""
+    codigo = (
+        "import time; from streamlit.testing.v1 import AppTest; "
+        f"app = AppTest.from_file({os.path.join(DIRETORIO, script)!r}, default_timeout=60); "
+        "t = time.perf_counter(); app.run(); primeira = time.perf_counter() - t; "
+        "t = time.perf_counter(); app.run(); print(primeira); print(time.perf_counter() - t)"
+    )
+    env = dict(os.environ, PYTHONPATH=DIRETORIO)
+    with tempfile.TemporaryDirectory() as tmp:
+        resultado = subprocess.run([sys.executable, '-c', codigo], capture_output=True, text=True, cwd=tmp, env=env)
+    return _ler_tempos(resultado, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args()
+
+    print("⏱️  Imports (melhor de {} execuções, processo novo)".format(args.repeticoes))
+    for modulo in MODULOS:
+        tempo = tempo_import(modulo, args.repeticoes)
+        print(f"  {modulo:<24} {'não instalado' if tempo is None else f'{tempo * 1000:8.1f} ms'}")
+
+    tempos = tempo_banco(args.repeticoes)
+    print("\n🗄️  EstoqueDB()")
+    if tempos is None:
+        print(f"  {'estoque_db':<24} indisponível (erro ao abrir o banco)")
+    else:
+        print(f"  {'banco novo (schema)':<24} {tempos[0] * 1000:8.1f} ms")
+        print(f"  {'banco existente':<24} {tempos[1] * 1000:8.1f} ms")
+
+    print("\n🖥️  Renderização (streamlit.testing)")
+    for script in DASHBOARDS:
+        tempos = tempo_renderizacao(script)
+        if tempos is None:
+            print(f"  {script:<24} indisponível (streamlit não instalado ou erro no script)")
+        else:
+            print(f"  {script:<24} 1ª: {tempos[0] * 1000:8.1f} ms | 2ª: {tempos[1] * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,12 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
-import sqlite3
-import numpy as np
+from datetime import datetime
 import time
-import requests
 from io import StringIO
 
+from status_estoque import classificar_status, SEMAFOROS
+from quadro_produtos import COLUNAS_TABELA, compactar_produtos, relatorio_memoria, formatar_bytes
+
 # Configuração da página
 st.set_page_config(
     page_title="Sistema de Estoque - Google Sheets",
@@ -55,9 +53,9 @@ class SheetsManager:
         self.produtos_url = st.session_state.get('produtos_url', '')
         self.movimentacoes_url = st.session_state.get('movimentacoes_url', '')
     
-    @st.cache_data(ttl=60)  # Cache por 1 minuto
+    @st.cache_resource(ttl=60, max_entries=2)  # Cache por 1 minuto, compartilhado entre sessões
     def carregar_produtos(_self, url):
-        """Carrega produtos do Google Sheets"""
+        """Carrega produtos do Google Sheets (quadro compacto, somente leitura)"""
         if not url:
             return pd.DataFrame()
         
@@ -69,6 +67,8 @@ class SheetsManager:
                 csv_url = url
             
             # Carregar dados
+            import requests
+            
             response = requests.get(csv_url)
             response.raise_for_status()
             
@@ -89,7 +89,10 @@ class SheetsManager:
             df['estoque_max'] = pd.to_numeric(df['estoque_max'], errors='coerce').fillna(0)
             df['custo_unitario'] = pd.to_numeric(df['custo_unitario'], errors='coerce').fillna(0)
             
-            return df
+            df = _self.adicionar_status_semaforo(df)
+            compacto = compactar_produtos(df)
+            compacto.attrs['memoria'] = relatorio_memoria(df, compacto, copias_completas=1)
+            return compacto
             
         except Exception as e:
             st.error(f"❌ Erro ao carregar planilha: {str(e)}")
@@ -100,21 +103,13 @@ class SheetsManager:
         if df.empty:
             return df
         
-        df['status'] = df.apply(lambda row: 
-            'CRÍTICO' if row['estoque_atual'] <= row['estoque_min']
-            else 'ATENÇÃO' if row['estoque_atual'] <= row['estoque_min'] * 1.5
-            else 'OK', axis=1)
-        
-        df['semaforo'] = df['status'].map({
-            'OK': '🟢',
-            'ATENÇÃO': '🟡', 
-            'CRÍTICO': '🔴'
-        })
-        
-        return df
+        status = classificar_status(df['estoque_atual'], df['estoque_min'])
+        return df.assign(status=status, semaforo=pd.Series(status, index=df.index).map(SEMAFOROS))
     
     def salvar_movimentacao_local(self, codigo, tipo, quantidade, motivo=""):
         """Salva movimentação no SQLite local (backup)"""
+        import sqlite3
+        
         conn = sqlite3.connect('movimentacoes_backup.db')
         cursor = conn.cursor()
         
@@ -165,6 +160,7 @@ produtos_url = st.sidebar.text_input(
 if produtos_url != st.session_state.get('produtos_url', ''):
     st.session_state['produtos_url'] = produtos_url
     st.cache_data.clear()
+    st.cache_resource.clear()
 
 # Instruções
 with st.sidebar.expander("📋 Como configurar"):
@@ -184,6 +180,7 @@ col_btn1, col_btn2 = st.sidebar.columns(2)
 with col_btn1:
     if st.button("🔄 Atualizar"):
         st.cache_data.clear()
+        st.cache_resource.clear()
         st.rerun()
 
 with col_btn2:
@@ -219,15 +216,18 @@ if not produtos_url:
     st.dataframe(exemplo_df, use_container_width=True)
     st.stop()
 
-# Carregar dados do Google Sheets
+# Carregar dados do Google Sheets (já com status e semáforo; não modificar, é compartilhado)
 produtos_df = sheets_manager.carregar_produtos(produtos_url)
 
 if produtos_df.empty:
     st.error("❌ Não foi possível carregar dados da planilha. Verifique a URL e permissões.")
     st.stop()
 
-# Adicionar status e semáforo
-produtos_df = sheets_manager.adicionar_status_semaforo(produtos_df)
+memoria = produtos_df.attrs['memoria']
+with st.sidebar.expander("🧠 Memória"):
+    st.metric("Quadro compartilhado", formatar_bytes(memoria['bytes_compacto']),
+              delta=f"-{memoria['reducao_percentual']:.0f}% vs. original", delta_color="inverse")
+    st.metric("Economia por sessão", formatar_bytes(memoria['bytes_economizados_por_sessao']))
 
 # Informações da conexão
 st.markdown(f"""
@@ -278,16 +278,19 @@ with col_left:
             ['Todos', 'CRÍTICO', 'ATENÇÃO', 'OK']
         )
     
-    # Aplicar filtros
-    df_filtrado = produtos_df.copy()
+    # Aplicar filtros (projeção e máscara sobre o quadro compartilhado, sem cópia completa)
+    df_filtrado = produtos_df[COLUNAS_TABELA]
+    mascara = pd.Series(True, index=produtos_df.index)
     if categoria_filter != 'Todas':
-        df_filtrado = df_filtrado[df_filtrado['categoria'] == categoria_filter]
+        mascara &= produtos_df['categoria'] == categoria_filter
     if status_filter != 'Todos':
-        df_filtrado = df_filtrado[df_filtrado['status'] == status_filter]
+        mascara &= produtos_df['status'] == status_filter
+    if not mascara.all():
+        df_filtrado = df_filtrado[mascara]
     
     # Exibir tabela
     st.dataframe(
-        df_filtrado[['semaforo', 'codigo', 'nome', 'categoria', 'estoque_atual', 'estoque_min', 'status']],
+        df_filtrado,
         use_container_width=True,
         height=400
     )
@@ -296,7 +299,11 @@ with col_right:
     # Gráfico de pizza - Status
     st.subheader("📈 Distribuição por Status")
     
+    # Plotly só é importado quando o primeiro gráfico é montado, depois das métricas
+    import plotly.express as px
+    
     status_counts = produtos_df['status'].value_counts()
+    status_counts = status_counts[status_counts > 0]
     
     fig_pie = px.pie(
         values=status_counts.values,
@@ -329,7 +336,7 @@ col_cat1, col_cat2 = st.columns([2, 1])
 
 with col_cat1:
     # Gráfico de barras por categoria
-    categoria_stats = produtos_df.groupby('categoria').agg({
+    categoria_stats = produtos_df.groupby('categoria', observed=True).agg({
         'estoque_atual': 'sum',
         'codigo': 'count'
     }).reset_index()
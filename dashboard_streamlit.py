@@ -1,11 +1,17 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
-import sqlite3
-import numpy as np
+from datetime import datetime
 import time
+import io
+import uuid
+
+from estoque_db import EstoqueDB
+from status_estoque import STATUS_ORDEM
+import importacao
+from amostragem import pontos_para_largura, reduzir_serie
+from quadro_produtos import COLUNAS_TABELA, compactar_produtos, relatorio_memoria, formatar_bytes
+from multi_deposito import EstoqueMultiDeposito, depositos_configurados
+from reposicao import MotorReposicao, PRAZO_REPOSICAO_DIAS
 
 # Configuração da página
 st.set_page_config(
@@ -61,166 +67,61 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Classe para gerenciar o banco de dados
-class EstoqueDB:
-    def __init__(self, db_path="estoque.db"):
-        self.db_path = db_path
-        self.init_database()
-    
-    def init_database(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Tabela produtos
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS produtos (
-                codigo TEXT PRIMARY KEY,
-                nome TEXT NOT NULL,
-                categoria TEXT,
-                estoque_atual INTEGER DEFAULT 0,
-                estoque_min INTEGER DEFAULT 0,
-                estoque_max INTEGER DEFAULT 0,
-                custo_unitario REAL DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Tabela movimentações
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS movimentacoes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                data_hora TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                codigo_produto TEXT,
-                tipo TEXT CHECK(tipo IN ('entrada', 'saida')),
-                quantidade INTEGER,
-                motivo TEXT,
-                saldo_anterior INTEGER,
-                saldo_atual INTEGER,
-                usuario TEXT DEFAULT 'streamlit',
-                FOREIGN KEY (codigo_produto) REFERENCES produtos (codigo)
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
-        self.inserir_dados_iniciais()
-    
-    def inserir_dados_iniciais(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT COUNT(*) FROM produtos")
-        if cursor.fetchone()[0] == 0:
-            produtos = [
-                ("P001", "Produto A", "Eletrônicos", 150, 50, 300, 25.50),
-                ("P002", "Produto B", "Eletrônicos", 30, 40, 200, 15.75),
-                ("P003", "Produto C", "Roupas", 80, 60, 250, 32.00),
-                ("P004", "Produto D", "Roupas", 200, 100, 400, 18.25),
-                ("P005", "Produto E", "Casa", 45, 50, 180, 42.80),
-                ("P006", "Produto F", "Casa", 120, 30, 200, 28.90),
-                ("P007", "Produto G", "Livros", 75, 25, 150, 12.50),
-                ("P008", "Produto H", "Livros", 15, 20, 100, 35.00)
-            ]
-            
-            cursor.executemany('''
-                INSERT INTO produtos (codigo, nome, categoria, estoque_atual, estoque_min, estoque_max, custo_unitario)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', produtos)
-            
-            conn.commit()
-        conn.close()
-    
-    def obter_produtos(self):
-        conn = sqlite3.connect(self.db_path)
-        df = pd.read_sql_query('''
-            SELECT codigo, nome, categoria, estoque_atual, estoque_min, estoque_max, custo_unitario
-            FROM produtos ORDER BY nome
-        ''', conn)
-        conn.close()
-        
-        # Adicionar status e semáforo
-        df['status'] = df.apply(lambda row: 
-            'CRÍTICO' if row['estoque_atual'] <= row['estoque_min']
-            else 'ATENÇÃO' if row['estoque_atual'] <= row['estoque_min'] * 1.5
-            else 'OK', axis=1)
-        
-        df['semaforo'] = df['status'].map({
-            'OK': '🟢',
-            'ATENÇÃO': '🟡', 
-            'CRÍTICO': '🔴'
-        })
-        
-        return df
-    
-    def registrar_movimentacao(self, codigo, tipo, quantidade, motivo=""):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        try:
-            # Obter estoque atual
-            cursor.execute("SELECT estoque_atual FROM produtos WHERE codigo = ?", (codigo,))
-            resultado = cursor.fetchone()
-            
-            if not resultado:
-                raise ValueError(f"Produto {codigo} não encontrado")
-            
-            saldo_anterior = resultado[0]
-            
-            # Calcular novo saldo
-            if tipo == "entrada":
-                saldo_atual = saldo_anterior + quantidade
-            else:  # saida
-                if saldo_anterior < quantidade:
-                    raise ValueError("Estoque insuficiente")
-                saldo_atual = saldo_anterior - quantidade
-            
-            # Registrar movimentação
-            cursor.execute('''
-                INSERT INTO movimentacoes (codigo_produto, tipo, quantidade, motivo, saldo_anterior, saldo_atual)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (codigo, tipo, quantidade, motivo, saldo_anterior, saldo_atual))
-            
-            # Atualizar estoque
-            cursor.execute("UPDATE produtos SET estoque_atual = ? WHERE codigo = ?", (saldo_atual, codigo))
-            
-            conn.commit()
-            return True
-            
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            conn.close()
-    
-    def obter_historico(self, codigo=None, dias=30):
-        conn = sqlite3.connect(self.db_path)
-        
-        if codigo:
-            query = '''
-                SELECT DATE(data_hora) as data, saldo_atual, codigo_produto
-                FROM movimentacoes 
-                WHERE codigo_produto = ? AND data_hora >= datetime('now', '-{} days')
-                ORDER BY data_hora
-            '''.format(dias)
-            df = pd.read_sql_query(query, conn, params=(codigo,))
-        else:
-            query = '''
-                SELECT data_hora, codigo_produto, tipo, quantidade, motivo, saldo_atual
-                FROM movimentacoes 
-                WHERE data_hora >= datetime('now', '-{} days')
-                ORDER BY data_hora DESC
-            '''.format(dias)
-            df = pd.read_sql_query(query, conn)
-        
-        conn.close()
-        return df
-
-# Inicializar banco de dados
+# Inicializar banco de dados (multi-depósito se ESTOQUE_DEPOSITOS estiver definido)
 @st.cache_resource
 def init_db():
+    depositos = depositos_configurados()
+    if depositos:
+        return EstoqueMultiDeposito(depositos)
     return EstoqueDB()
 
-db = init_db()
+estoque = init_db()
+db = estoque if isinstance(estoque, EstoqueDB) else estoque.deposito(estoque.locais[0])
+
+@st.cache_resource(max_entries=8)
+def produtos_compartilhados(_fonte, nome_fonte, versao):
+    """Quadro de produtos compacto, um por fonte e versão dos dados, compartilhado (somente leitura) entre sessões"""
+    original = _fonte.obter_produtos()
+    compacto = compactar_produtos(original)
+    return compacto, relatorio_memoria(original, compacto)
+
+# Acima disso a tabela de semáforos é exibida sem Styler
+LIMITE_TABELA_ESTILIZADA = 5000
+
+# Largura típica (px) dos gráficos de linha em layout wide
+LARGURA_GRAFICO_PX = 1200
+
+@st.cache_resource
+def motor_reposicao(_db, deposito):
+    """Motor de reposição por depósito; mantém o consumo acumulado entre execuções"""
+    return MotorReposicao(_db)
+
+# Linhas exibidas na tabela de sugestões de compra
+LIMITE_SUGESTOES = 100
+
+@st.cache_data(max_entries=256)
+def historico_reduzido(deposito, codigo, versao, limites, max_pontos=pontos_para_largura(LARGURA_GRAFICO_PX)):
+    """Histórico do produto já reduzido para o gráfico; a versão dos dados invalida o cache"""
+    historico = db.obter_historico(codigo)
+    return reduzir_serie(historico, 'data', 'saldo_atual', max_pontos, limites), len(historico)
+
+def seletor_produto(label, key, limite=20):
+    """Campo de busca + selectbox com os melhores resultados (sem carregar o catálogo inteiro)"""
+    termo = st.text_input(f"🔍 Buscar {label.lower().rstrip(':')}", key=f"{key}_busca",
+                          placeholder="Código, nome ou categoria...")
+    resultados = db.buscar_produtos(termo, limite)
+    
+    if len(resultados) == 0:
+        st.caption("Nenhum produto encontrado")
+        return None
+    
+    nomes = dict(zip(resultados['codigo'], resultados['nome']))
+    return st.selectbox(
+        label,
+        resultados['codigo'].tolist(),
+        format_func=lambda x: f"{x} - {nomes[x]}",
+        key=key
+    )
 
 # Header principal
 st.markdown("""
@@ -233,6 +134,26 @@ st.markdown("""
 # Sidebar
 st.sidebar.title("🔧 Controles")
 
+# Depósitos: movimentações vão para o depósito selecionado; a visão consolidada
+# soma todos os depósitos (consultados em paralelo)
+deposito_atual = None
+visao_consolidada = False
+if isinstance(estoque, EstoqueMultiDeposito):
+    deposito_atual = st.sidebar.selectbox("🏬 Depósito:", estoque.locais)
+    db = estoque.deposito(deposito_atual)
+    visao_consolidada = st.sidebar.checkbox("🌐 Visão consolidada (todos os depósitos)", value=False)
+    
+    with st.sidebar.expander("🔁 Transferência entre depósitos"):
+        transf_produto = seletor_produto("Produto:", key="transf_produto")
+        transf_destino = st.selectbox("Destino:", [d for d in estoque.locais if d != deposito_atual])
+        transf_quantidade = st.number_input("Quantidade:", min_value=1, value=1, key="transf_quantidade")
+        if st.button("🔁 Transferir", disabled=transf_produto is None or transf_destino is None):
+            try:
+                estoque.transferir(transf_produto, deposito_atual, transf_destino, transf_quantidade)
+                st.success(f"✅ {transf_quantidade} unidades transferidas para {transf_destino}")
+            except Exception as e:
+                st.error(f"❌ Erro: {str(e)}")
+
 # Auto-refresh
 auto_refresh = st.sidebar.checkbox("🔄 Auto-refresh (30s)", value=False)
 if auto_refresh:
@@ -244,8 +165,58 @@ if st.sidebar.button("🔄 Atualizar Dados"):
     st.cache_data.clear()
     st.rerun()
 
-# Obter dados
-produtos_df = db.obter_produtos()
+# Importação / exportação em massa
+with st.sidebar.expander("📥 Importar / 📤 Exportar"):
+    tipo_dados = st.radio("Dados:", ["Produtos", "Movimentações"], key="io_tipo")
+    
+    arquivo = st.file_uploader("Arquivo CSV ou XLSX", type=["csv", "xlsx"], key="io_arquivo")
+    if tipo_dados == "Produtos":
+        upsert = st.checkbox("Atualizar produtos existentes (upsert)", value=False)
+    else:
+        atualizar_estoque = st.checkbox("Ajustar estoque ao último saldo importado", value=False)
+    
+    if arquivo is not None and st.button("📥 Importar"):
+        progresso_txt = st.empty()
+        progresso = lambda r: progresso_txt.caption(f"{r['linhas']} linhas importadas...")
+        try:
+            if tipo_dados == "Produtos":
+                resumo = importacao.importar_produtos(db, arquivo, 'upsert' if upsert else 'inserir', progresso=progresso)
+                if deposito_atual is not None:
+                    # Novos produtos (e cadastro atualizado) chegam aos outros depósitos com estoque zero
+                    estoque.sincronizar_catalogo(origem=deposito_atual)
+            else:
+                resumo = importacao.importar_movimentacoes(db, arquivo, atualizar_estoque=atualizar_estoque, progresso=progresso)
+            ignoradas = f", {resumo['ignoradas']} já cadastradas ignoradas" if resumo.get('ignoradas') else ""
+            st.success(f"✅ {resumo['linhas']} linhas importadas ({resumo['rejeitadas']} rejeitadas{ignoradas})")
+            st.cache_data.clear()
+        except Exception as e:
+            st.error(f"❌ Erro: {str(e)}")
+    
+    formato_export = st.selectbox("Formato de exportação:", ["csv", "xlsx"], key="io_formato")
+    if st.button("📤 Gerar arquivo"):
+        buffer = io.BytesIO()
+        if tipo_dados == "Produtos":
+            importacao.exportar_produtos(db, buffer, formato=formato_export)
+        else:
+            importacao.exportar_movimentacoes(db, buffer, formato=formato_export)
+        st.download_button(
+            "⬇️ Baixar",
+            buffer.getvalue(),
+            file_name=f"{'produtos' if tipo_dados == 'Produtos' else 'movimentacoes'}.{formato_export}"
+        )
+
+# Obter dados (não modificar: o quadro é compartilhado entre sessões)
+produtos_deposito_df, memoria = produtos_compartilhados(db, deposito_atual, db.versao_dados())
+produtos_df = produtos_deposito_df
+if visao_consolidada:
+    produtos_df, memoria = produtos_compartilhados(estoque, "consolidado", estoque.versao_dados())
+    st.info(f"🌐 Visão consolidada de {len(estoque.locais)} depósitos | Alertas e evolução: depósito **{deposito_atual}**")
+
+with st.sidebar.expander("🧠 Memória"):
+    st.caption(f"{memoria['linhas']} produtos")
+    st.metric("Quadro compartilhado", formatar_bytes(memoria['bytes_compacto']),
+              delta=f"-{memoria['reducao_percentual']:.0f}% vs. original", delta_color="inverse")
+    st.metric("Economia por sessão", formatar_bytes(memoria['bytes_economizados_por_sessao']))
 
 # Métricas principais
 col1, col2, col3, col4 = st.columns(4)
@@ -282,18 +253,24 @@ with col_left:
         else:
             return 'background-color: #e8f5e8; color: #2e7d32'
     
-    # Exibir tabela estilizada
-    styled_df = produtos_df[['semaforo', 'codigo', 'nome', 'categoria', 'estoque_atual', 'estoque_min', 'status']].style.applymap(
-        color_status, subset=['status']
-    )
+    # Exibir tabela estilizada (o Styler gera CSS por célula: em catálogos grandes
+    # exibe-se a projeção das colunas direto, o semáforo já indica o status)
+    colunas_tabela = COLUNAS_TABELA + (list(estoque.colunas_estoque.values()) if visao_consolidada else [])
+    tabela_df = produtos_df[colunas_tabela]
+    if len(tabela_df) <= LIMITE_TABELA_ESTILIZADA:
+        tabela_df = tabela_df.style.applymap(color_status, subset=['status'])
     
-    st.dataframe(styled_df, use_container_width=True, height=400)
+    st.dataframe(tabela_df, use_container_width=True, height=400)
 
 with col_right:
     # Gráfico de pizza - Status
     st.subheader("📈 Distribuição por Status")
     
+    # Plotly só é importado quando o primeiro gráfico é montado, depois das métricas
+    import plotly.express as px
+    
     status_counts = produtos_df['status'].value_counts()
+    status_counts = status_counts[status_counts > 0]
     
     fig_pie = px.pie(
         values=status_counts.values,
@@ -309,31 +286,86 @@ with col_right:
     fig_pie.update_layout(height=300)
     st.plotly_chart(fig_pie, use_container_width=True)
     
-    # Alertas
+    # Alertas: feed das transições desde a última visita
     st.subheader("🚨 Alertas")
-    produtos_criticos_lista = produtos_df[produtos_df['status'] == 'CRÍTICO']
     
-    if len(produtos_criticos_lista) > 0:
-        for _, produto in produtos_criticos_lista.iterrows():
-            st.error(f"🔴 **{produto['nome']}** - Estoque: {produto['estoque_atual']} (Mín: {produto['estoque_min']})")
+    ALERTAS_POR_PAGINA = 20
+    ALERTAS_MAX_PAGINAS = 10
+    
+    contadores = db.obter_contadores_status()
+    if contadores['CRÍTICO'] > 0:
+        st.error(f"🔴 **{contadores['CRÍTICO']}** produtos em situação crítica | 🟡 {contadores['ATENÇÃO']} em atenção")
     else:
         st.success("✅ Nenhum produto em situação crítica!")
+    
+    # "Visto" gravado no banco (por depósito) e por leitor: ?leitor=nome na URL identifica
+    # o usuário; sem ele, cada sessão ganha uma chave própria, gravada na URL para
+    # sobreviver a recarregar a página
+    if 'leitor' not in st.query_params:
+        st.query_params['leitor'] = st.session_state.setdefault('leitor', uuid.uuid4().hex[:12])
+    leitor = st.query_params['leitor']
+    ultimo_visto = db.obter_alerta_visto(leitor)
+    ultimo_alerta = db.ultimo_alerta_id()
+    
+    resumo = db.resumo_alertas(ultimo_visto)
+    total_novos = int(resumo['quantidade'].sum()) if len(resumo) > 0 else 0
+    
+    if total_novos > 0:
+        # Agrupar por transição (ex: OK → CRÍTICO)
+        for _, grupo in resumo.sort_values('quantidade', ascending=False).iterrows():
+            texto = f"{grupo['status_anterior']} → {grupo['status_novo']}: **{grupo['quantidade']}**"
+            if grupo['status_novo'] == 'CRÍTICO':
+                st.error(f"🔴 {texto}")
+            elif grupo['status_novo'] == 'ATENÇÃO':
+                st.warning(f"🟡 {texto}")
+            else:
+                st.success(f"🟢 {texto}")
+        
+        status_feed = st.selectbox("Mostrar:", ['Todos'] + STATUS_ORDEM, key="alertas_status")
+        total_feed = total_novos if status_feed == 'Todos' else int(
+            resumo.loc[resumo['status_novo'] == status_feed, 'quantidade'].sum()
+        )
+        total_paginas = max(1, min(ALERTAS_MAX_PAGINAS, -(-total_feed // ALERTAS_POR_PAGINA)))
+        pagina = st.number_input("Página:", min_value=1, max_value=total_paginas, value=1, key="alertas_pagina")
+        
+        alertas_df = db.obter_alertas(
+            ultimo_visto,
+            limite=ALERTAS_POR_PAGINA,
+            offset=(pagina - 1) * ALERTAS_POR_PAGINA,
+            status=None if status_feed == 'Todos' else status_feed
+        )
+        st.dataframe(
+            alertas_df[['data_hora', 'codigo_produto', 'nome', 'status_anterior', 'status_novo', 'estoque_atual', 'estoque_min']],
+            use_container_width=True,
+            height=250
+        )
+        if total_feed > ALERTAS_POR_PAGINA * ALERTAS_MAX_PAGINAS:
+            st.caption(f"Exibindo os {ALERTAS_POR_PAGINA * ALERTAS_MAX_PAGINAS} alertas mais recentes de {total_feed}")
+        
+        if st.button("👁️ Marcar como visto"):
+            db.marcar_alertas_vistos(ultimo_alerta, leitor)
+            st.rerun()
+    else:
+        st.info("📭 Nenhuma mudança de status desde a última visita")
 
 # Gráficos de evolução
 st.subheader("📈 Evolução do Estoque")
 
 # Seletor de produto
-produto_selecionado = st.selectbox(
-    "Selecione um produto:",
-    produtos_df['codigo'].tolist(),
-    format_func=lambda x: f"{x} - {produtos_df[produtos_df['codigo']==x]['nome'].iloc[0]}"
-)
+produto_selecionado = seletor_produto("Selecione um produto:", key="evolucao_produto")
 
 if produto_selecionado:
-    historico_df = db.obter_historico(produto_selecionado)
-    produto_info = produtos_df[produtos_df['codigo'] == produto_selecionado].iloc[0]
+    produto_info = produtos_deposito_df[produtos_deposito_df['codigo'] == produto_selecionado].iloc[0]
+    historico_df, total_pontos = historico_reduzido(
+        deposito_atual,
+        produto_selecionado,
+        db.versao_dados(),
+        (int(produto_info['estoque_min']), int(produto_info['estoque_max']))
+    )
     
     if len(historico_df) > 0:
+        import plotly.graph_objects as go
+        
         # Gráfico de linha
         fig_line = go.Figure()
         
@@ -370,6 +402,8 @@ if produto_selecionado:
         )
         
         st.plotly_chart(fig_line, use_container_width=True)
+        if total_pontos > len(historico_df):
+            st.caption(f"📉 Exibindo {len(historico_df)} de {total_pontos} pontos (cruzamentos de mínimo/máximo preservados)")
     else:
         st.info("📊 Sem histórico disponível para este produto")
 
@@ -379,12 +413,7 @@ st.subheader("➕ Registrar Movimentação")
 col_mov1, col_mov2, col_mov3, col_mov4 = st.columns(4)
 
 with col_mov1:
-    mov_produto = st.selectbox(
-        "Produto:",
-        produtos_df['codigo'].tolist(),
-        format_func=lambda x: f"{x} - {produtos_df[produtos_df['codigo']==x]['nome'].iloc[0]}",
-        key="mov_produto"
-    )
+    mov_produto = seletor_produto("Produto:", key="mov_produto")
 
 with col_mov2:
     mov_tipo = st.selectbox("Tipo:", ["entrada", "saida"])
@@ -395,7 +424,7 @@ with col_mov3:
 with col_mov4:
     mov_motivo = st.text_input("Motivo:", placeholder="Ex: Compra, Venda...")
 
-if st.button("✅ Registrar Movimentação", type="primary"):
+if st.button("✅ Registrar Movimentação", type="primary", disabled=mov_produto is None):
     try:
         db.registrar_movimentacao(mov_produto, mov_tipo, mov_quantidade, mov_motivo)
         st.success(f"✅ Movimentação registrada: {mov_tipo} de {mov_quantidade} unidades")
@@ -406,16 +435,24 @@ if st.button("✅ Registrar Movimentação", type="primary"):
 
 # Histórico recente
 st.subheader("📋 Movimentações Recentes")
-historico_recente = db.obter_historico(dias=7)
+colunas_historico = ['data_hora', 'codigo_produto', 'tipo', 'quantidade', 'motivo', 'saldo_atual']
+if visao_consolidada:
+    historico_recente = estoque.obter_historico(dias=7)
+    colunas_historico.insert(1, 'deposito')
+else:
+    historico_recente = db.obter_historico(dias=7)
 
 if len(historico_recente) > 0:
-    # Formatar data
-    historico_recente['data_hora'] = pd.to_datetime(historico_recente['data_hora']).dt.strftime('%d/%m/%Y %H:%M')
+    # Formatar data no próprio componente (sem gerar uma coluna de texto)
+    historico_recente['data_hora'] = pd.to_datetime(historico_recente['data_hora'])
     
     st.dataframe(
-        historico_recente[['data_hora', 'codigo_produto', 'tipo', 'quantidade', 'motivo', 'saldo_atual']],
+        historico_recente[colunas_historico],
         use_container_width=True,
-        height=300
+        height=300,
+        column_config={
+            'data_hora': st.column_config.DatetimeColumn(format="DD/MM/YYYY HH:mm")
+        }
     )
 else:
     st.info("📋 Nenhuma movimentação recente")
@@ -423,7 +460,7 @@ else:
 # Análises por categoria
 st.subheader("📊 Análise por Categoria")
 
-categoria_stats = produtos_df.groupby('categoria').agg({
+categoria_stats = produtos_df.groupby('categoria', observed=True).agg({
     'estoque_atual': 'sum',
     'codigo': 'count',
     'custo_unitario': 'mean'
@@ -431,7 +468,7 @@ categoria_stats = produtos_df.groupby('categoria').agg({
 
 categoria_stats.columns = ['Estoque Total', 'Qtd Produtos', 'Custo Médio']
 
-# Gráfico de barras por categoria
+# Gráfico de barras por categoria (px já importado no gráfico de pizza)
 fig_bar = px.bar(
     x=categoria_stats.index,
     y=categoria_stats['Estoque Total'],
@@ -449,6 +486,42 @@ with col_cat1:
 with col_cat2:
     st.dataframe(categoria_stats, use_container_width=True)
 
+# Reposição: consumo médio, cobertura e sugestão de compra
+st.subheader("🛒 Sugestão de Reposição")
+
+reposicao_df = motor_reposicao(db, deposito_atual).calcular(produtos_deposito_df)
+a_comprar = reposicao_df[reposicao_df['sugestao_compra'] > 0]
+
+col_rep1, col_rep2, col_rep3 = st.columns(3)
+
+with col_rep1:
+    st.metric(f"⏳ Ruptura em até {PRAZO_REPOSICAO_DIAS} dias", int((reposicao_df['dias_cobertura'] <= PRAZO_REPOSICAO_DIAS).sum()))
+
+with col_rep2:
+    st.metric("🛒 Produtos a comprar", len(a_comprar))
+
+with col_rep3:
+    st.metric("💰 Custo da sugestão", f"R$ {a_comprar['custo_sugestao'].sum():,.2f}")
+
+if len(a_comprar) > 0:
+    st.dataframe(
+        a_comprar.sort_values('dias_cobertura', na_position='last').head(LIMITE_SUGESTOES),
+        use_container_width=True,
+        height=300,
+        hide_index=True,
+        column_config={
+            'consumo_diario': st.column_config.NumberColumn("Consumo/dia", format="%.2f"),
+            'dias_cobertura': st.column_config.NumberColumn("Dias de cobertura", format="%.1f"),
+            'data_ruptura': st.column_config.DateColumn("Ruptura prevista", format="DD/MM/YYYY"),
+            'sugestao_compra': st.column_config.NumberColumn("Comprar"),
+            'custo_sugestao': st.column_config.NumberColumn("Custo", format="R$ %.2f")
+        }
+    )
+    if len(a_comprar) > LIMITE_SUGESTOES:
+        st.caption(f"Exibindo os {LIMITE_SUGESTOES} mais urgentes de {len(a_comprar)}")
+else:
+    st.success("✅ Nenhuma compra sugerida no momento")
+
 # Footer
 st.markdown("---")
 st.markdown("""
@@ -0,0 +1,641 @@
+import pandas as pd
+import sqlite3
+
+from status_estoque import STATUS_ORDEM, SEMAFOROS, classificar_status, status_sql
+
+# Versão do schema gravada em PRAGMA user_version; incrementar ao mudar tabelas/índices/triggers
+SCHEMA_VERSAO = 5
+
+# Busca de produtos: máximo de candidatos lidos do FTS por consulta
+# (termos curtos ou comuns casam com boa parte do catálogo)
+BUSCA_MAX_CANDIDATOS = 500
+
+# Classe para gerenciar o banco de dados
+class EstoqueDB:
+    def __init__(self, db_path="estoque.db", dados_iniciais=True):
+        self.db_path = db_path
+        # False: banco novo começa sem o catálogo de demonstração (ex: depósitos além do primeiro)
+        self.dados_iniciais = dados_iniciais
+        self.init_database()
+    
+    def init_database(self):
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        # Caminho rápido: schema já criado nesta versão, nada a fazer
+        cursor.execute("PRAGMA user_version")
+        if cursor.fetchone()[0] == SCHEMA_VERSAO:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'produtos_fts'")
+            self.fts_disponivel = cursor.fetchone() is not None
+            conn.close()
+            return
+        
+        # Tabela produtos
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS produtos (
+                codigo TEXT PRIMARY KEY,
+                nome TEXT NOT NULL,
+                categoria TEXT,
+                estoque_atual INTEGER DEFAULT 0,
+                estoque_min INTEGER DEFAULT 0,
+                estoque_max INTEGER DEFAULT 0,
+                custo_unitario REAL DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Tabela movimentações
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS movimentacoes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                data_hora TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                codigo_produto TEXT,
+                tipo TEXT CHECK(tipo IN ('entrada', 'saida')),
+                quantidade INTEGER,
+                motivo TEXT,
+                saldo_anterior INTEGER,
+                saldo_atual INTEGER,
+                usuario TEXT DEFAULT 'streamlit',
+                transferencia INTEGER NOT NULL DEFAULT 0,
+                FOREIGN KEY (codigo_produto) REFERENCES produtos (codigo)
+            )
+        ''')
+        self.migrar_movimentacoes(cursor)
+        self.criar_indices_movimentacoes(cursor)
+        
+        # Tabela de alertas: transições de status gravadas pelos triggers
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS alertas (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                data_hora TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                codigo_produto TEXT,
+                status_anterior TEXT,
+                status_novo TEXT,
+                estoque_atual INTEGER,
+                estoque_min INTEGER,
+                FOREIGN KEY (codigo_produto) REFERENCES produtos (codigo)
+            )
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_alertas_produto
+            ON alertas (codigo_produto, id)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_alertas_status
+            ON alertas (status_novo, id)
+        ''')
+        
+        # Último alerta visto por leitor (sobrevive a recarregar a página)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS alertas_vistos (
+                leitor TEXT PRIMARY KEY,
+                ultimo_id INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        
+        # Contadores por status, mantidos pelos triggers (evita recontar a tabela)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS contadores_status (
+                status TEXT PRIMARY KEY,
+                total INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        cursor.executemany(
+            "INSERT OR IGNORE INTO contadores_status (status, total) VALUES (?, 0)",
+            [(status,) for status in STATUS_ORDEM]
+        )
+        
+        # Schema novo ou desatualizado: triggers e contadores refeitos com a regra atual de status
+        self.remover_triggers_alertas(cursor)
+        cursor.execute('''
+            UPDATE contadores_status SET total = (
+                SELECT COUNT(*) FROM produtos WHERE {} = contadores_status.status
+            )
+        '''.format(status_sql("produtos")))
+        self.criar_triggers_alertas(cursor)
+        self.criar_indice_busca(cursor)
+        self.criar_versao_dados(cursor)
+        
+        if self.dados_iniciais:
+            self.inserir_dados_iniciais(cursor)
+        self.marcar_schema_atual(cursor)
+        conn.commit()
+        conn.close()
+    
+    def marcar_schema_atual(self, cursor):
+        cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSAO}")
+    
+    def invalidar_schema(self, cursor):
+        """Força a recriação do schema na próxima abertura (ex: importação interrompida)"""
+        cursor.execute("PRAGMA user_version = 0")
+    
+    def ativar_wal(self):
+        """Modo WAL: leituras não bloqueiam a escrita (persistente no arquivo)"""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.close()
+    
+    def migrar_movimentacoes(self, cursor):
+        """Bancos anteriores à coluna transferencia: cria a coluna e marca as transferências já gravadas"""
+        cursor.execute("PRAGMA table_info(movimentacoes)")
+        if 'transferencia' in [linha[1] for linha in cursor.fetchall()]:
+            return
+        cursor.execute("ALTER TABLE movimentacoes ADD COLUMN transferencia INTEGER NOT NULL DEFAULT 0")
+        cursor.execute('''
+            UPDATE movimentacoes SET transferencia = 1
+            WHERE motivo LIKE 'Transferência para %' OR motivo LIKE 'Transferência de %'
+               OR motivo LIKE 'Estorno de transferência %'
+        ''')
+        # O índice de consumo passa a incluir a coluna
+        cursor.execute("DROP INDEX IF EXISTS idx_movimentacoes_consumo")
+    
+    def criar_indices_movimentacoes(self, cursor):
+        # Histórico por produto (obter_historico) e por período
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_movimentacoes_produto_data
+            ON movimentacoes (codigo_produto, data_hora)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_movimentacoes_data
+            ON movimentacoes (data_hora)
+        ''')
+        # Índice de cobertura para o consumo por produto (reposicao.MotorReposicao)
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_movimentacoes_consumo
+            ON movimentacoes (tipo, transferencia, codigo_produto, data_hora, quantidade)
+        ''')
+    
+    def remover_indices_movimentacoes(self, cursor):
+        """Usado na importação em massa: os índices são recriados no final"""
+        cursor.execute("DROP INDEX IF EXISTS idx_movimentacoes_produto_data")
+        cursor.execute("DROP INDEX IF EXISTS idx_movimentacoes_data")
+        cursor.execute("DROP INDEX IF EXISTS idx_movimentacoes_consumo")
+    
+    def remover_triggers_busca(self, cursor):
+        """Usado na importação em massa: o índice FTS é reconstruído no final"""
+        cursor.execute("DROP TRIGGER IF EXISTS trg_produtos_fts_insert")
+        cursor.execute("DROP TRIGGER IF EXISTS trg_produtos_fts_delete")
+        cursor.execute("DROP TRIGGER IF EXISTS trg_produtos_fts_update")
+        cursor.execute("DROP INDEX IF EXISTS idx_produtos_nome")
+    
+    def reconstruir_indice_busca(self, cursor):
+        self.criar_indice_busca(cursor)
+        if self.fts_disponivel:
+            cursor.execute("INSERT INTO produtos_fts (produtos_fts) VALUES ('rebuild')")
+    
+    def remover_triggers_alertas(self, cursor):
+        cursor.execute("DROP TRIGGER IF EXISTS trg_produtos_status_insert")
+        cursor.execute("DROP TRIGGER IF EXISTS trg_produtos_status_delete")
+        cursor.execute("DROP TRIGGER IF EXISTS trg_produtos_status_update")
+    
+    def criar_triggers_alertas(self, cursor):
+        """Registra transições de status e mantém os contadores no momento da escrita"""
+        status_old = status_sql("OLD")
+        status_new = status_sql("NEW")
+        
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_produtos_status_insert
+            AFTER INSERT ON produtos
+            BEGIN
+                UPDATE contadores_status SET total = total + 1 WHERE status = {new};
+            END
+        '''.format(new=status_new))
+        
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_produtos_status_delete
+            AFTER DELETE ON produtos
+            BEGIN
+                UPDATE contadores_status SET total = total - 1 WHERE status = {old};
+            END
+        '''.format(old=status_old))
+        
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_produtos_status_update
+            AFTER UPDATE OF estoque_atual, estoque_min ON produtos
+            WHEN {old} <> {new}
+            BEGIN
+                INSERT INTO alertas (codigo_produto, status_anterior, status_novo, estoque_atual, estoque_min)
+                VALUES (NEW.codigo, {old}, {new}, NEW.estoque_atual, NEW.estoque_min);
+                UPDATE contadores_status SET total = total - 1 WHERE status = {old};
+                UPDATE contadores_status SET total = total + 1 WHERE status = {new};
+            END
+        '''.format(old=status_old, new=status_new))
+    
+    def criar_indice_busca(self, cursor):
+        """Índice FTS5 sobre codigo/nome/categoria, sincronizado por triggers"""
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_produtos_nome ON produtos (nome)")
+        
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'produtos_fts'")
+        indice_novo = cursor.fetchone() is None
+        try:
+            cursor.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS produtos_fts USING fts5(
+                    codigo, nome, categoria,
+                    content='produtos',
+                    prefix='1 2 3',
+                    tokenize='unicode61 remove_diacritics 2'
+                )
+            ''')
+        except sqlite3.OperationalError:
+            # SQLite compilado sem FTS5: busca cai para LIKE
+            self.fts_disponivel = False
+            return
+        self.fts_disponivel = True
+        
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_produtos_fts_insert
+            AFTER INSERT ON produtos
+            BEGIN
+                INSERT INTO produtos_fts (rowid, codigo, nome, categoria)
+                VALUES (NEW.rowid, NEW.codigo, NEW.nome, NEW.categoria);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_produtos_fts_delete
+            AFTER DELETE ON produtos
+            BEGIN
+                INSERT INTO produtos_fts (produtos_fts, rowid, codigo, nome, categoria)
+                VALUES ('delete', OLD.rowid, OLD.codigo, OLD.nome, OLD.categoria);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_produtos_fts_update
+            AFTER UPDATE OF codigo, nome, categoria ON produtos
+            BEGIN
+                INSERT INTO produtos_fts (produtos_fts, rowid, codigo, nome, categoria)
+                VALUES ('delete', OLD.rowid, OLD.codigo, OLD.nome, OLD.categoria);
+                INSERT INTO produtos_fts (rowid, codigo, nome, categoria)
+                VALUES (NEW.rowid, NEW.codigo, NEW.nome, NEW.categoria);
+            END
+        ''')
+        
+        if indice_novo:
+            # Banco já existente: indexar o catálogo atual
+            cursor.execute("INSERT INTO produtos_fts (produtos_fts) VALUES ('rebuild')")
+    
+    def criar_versao_dados(self, cursor):
+        """Contador incrementado a cada escrita em produtos (usado como ETag/chave de cache)"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS versao_dados (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                valor INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        cursor.execute("INSERT OR IGNORE INTO versao_dados (id, valor) VALUES (1, 0)")
+        for evento in ('INSERT', 'UPDATE', 'DELETE'):
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS trg_produtos_versao_{nome}
+                AFTER {evento} ON produtos
+                BEGIN
+                    UPDATE versao_dados SET valor = valor + 1 WHERE id = 1;
+                END
+            '''.format(nome=evento.lower(), evento=evento))
+    
+    def versao_dados(self):
+        """Versão atual dos dados: muda sempre que produtos ou movimentações mudam"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT (SELECT valor FROM versao_dados WHERE id = 1),
+                   (SELECT COALESCE(MAX(id), 0) FROM movimentacoes)
+        ''')
+        produtos, movimentacoes = cursor.fetchone()
+        conn.close()
+        return f"{produtos}.{movimentacoes}"
+    
+    def inserir_dados_iniciais(self, cursor):
+        cursor.execute("SELECT COUNT(*) FROM produtos")
+        if cursor.fetchone()[0] == 0:
+            produtos = [
+                ("P001", "Produto A", "Eletrônicos", 150, 50, 300, 25.50),
+                ("P002", "Produto B", "Eletrônicos", 30, 40, 200, 15.75),
+                ("P003", "Produto C", "Roupas", 80, 60, 250, 32.00),
+                ("P004", "Produto D", "Roupas", 200, 100, 400, 18.25),
+                ("P005", "Produto E", "Casa", 45, 50, 180, 42.80),
+                ("P006", "Produto F", "Casa", 120, 30, 200, 28.90),
+                ("P007", "Produto G", "Livros", 75, 25, 150, 12.50),
+                ("P008", "Produto H", "Livros", 15, 20, 100, 35.00)
+            ]
+            
+            cursor.executemany('''
+                INSERT INTO produtos (codigo, nome, categoria, estoque_atual, estoque_min, estoque_max, custo_unitario)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', produtos)
+    
+    def obter_produtos(self, limite=None, offset=0):
+        conn = sqlite3.connect(self.db_path)
+        df = pd.read_sql_query('''
+            SELECT codigo, nome, categoria, estoque_atual, estoque_min, estoque_max, custo_unitario
+            FROM produtos ORDER BY nome
+            LIMIT ? OFFSET ?
+        ''', conn, params=(-1 if limite is None else limite, offset))
+        conn.close()
+        
+        # Adicionar status e semáforo
+        df['status'] = classificar_status(df['estoque_atual'], df['estoque_min'])
+        df['semaforo'] = df['status'].map(SEMAFOROS)
+        
+        return df
+    
+    def obter_catalogo(self, codigos=None):
+        """Cadastro dos produtos (sem estoque_atual), opcionalmente só dos códigos informados"""
+        conn = sqlite3.connect(self.db_path)
+        query = "SELECT codigo, nome, categoria, estoque_min, estoque_max, custo_unitario FROM produtos"
+        params = ()
+        if codigos is not None:
+            codigos = list(codigos)
+            query += f" WHERE codigo IN ({', '.join('?' * len(codigos))})"
+            params = tuple(codigos)
+        df = pd.read_sql_query(query, conn, params=params)
+        conn.close()
+        return df
+    
+    def sincronizar_cadastro(self, catalogo, atualizar=False):
+        """Cadastra os produtos do catálogo que faltam neste banco, com estoque, mínimo e máximo zero.
+        
+        O produto passa a existir no depósito sem ser estocado ali: sem mínimo, fica
+        OK e fora da sugestão de compra até alguém definir os limites do depósito.
+        Com atualizar=True, nome, categoria e custo dos produtos existentes também
+        passam a ser os do catálogo (estoque, mínimo e máximo não mudam).
+        Retorna o número de produtos inseridos ou alterados.
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        conflito = '''
+            DO UPDATE SET nome = excluded.nome, categoria = excluded.categoria,
+                          custo_unitario = excluded.custo_unitario
+            WHERE nome IS NOT excluded.nome OR categoria IS NOT excluded.categoria
+               OR custo_unitario IS NOT excluded.custo_unitario
+        ''' if atualizar else "DO NOTHING"
+        try:
+            cursor.executemany(f'''
+                INSERT INTO produtos (codigo, nome, categoria, estoque_atual, estoque_min, estoque_max, custo_unitario)
+                VALUES (?, ?, ?, 0, 0, 0, ?)
+                ON CONFLICT (codigo) {conflito}
+            ''', catalogo[['codigo', 'nome', 'categoria', 'custo_unitario']].itertuples(index=False, name=None))
+            conn.commit()
+            return max(cursor.rowcount, 0)
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            conn.close()
+    
+    def _aplicar_movimentacao(self, cursor, codigo, tipo, quantidade, motivo="", usuario="streamlit", transferencia=False):
+        if tipo not in ("entrada", "saida"):
+            raise ValueError(f"Tipo inválido: {tipo}")
+        if quantidade <= 0:
+            raise ValueError("Quantidade deve ser maior que zero")
+        
+        # Obter estoque atual
+        cursor.execute("SELECT estoque_atual FROM produtos WHERE codigo = ?", (codigo,))
+        resultado = cursor.fetchone()
+        
+        if not resultado:
+            raise ValueError(f"Produto {codigo} não encontrado")
+        
+        saldo_anterior = resultado[0]
+        
+        # Calcular novo saldo
+        if tipo == "entrada":
+            saldo_atual = saldo_anterior + quantidade
+        else:  # saida
+            if saldo_anterior < quantidade:
+                raise ValueError("Estoque insuficiente")
+            saldo_atual = saldo_anterior - quantidade
+        
+        # Registrar movimentação
+        cursor.execute('''
+            INSERT INTO movimentacoes (codigo_produto, tipo, quantidade, motivo, saldo_anterior, saldo_atual, usuario, transferencia)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (codigo, tipo, quantidade, motivo, saldo_anterior, saldo_atual, usuario, int(transferencia)))
+        
+        # Atualizar estoque
+        cursor.execute("UPDATE produtos SET estoque_atual = ? WHERE codigo = ?", (saldo_atual, codigo))
+        return saldo_atual
+    
+    def registrar_movimentacao(self, codigo, tipo, quantidade, motivo="", usuario="streamlit", transferencia=False):
+        """transferencia=True marca movimentações entre depósitos (e estornos), que não contam como consumo"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        try:
+            self._aplicar_movimentacao(cursor, codigo, tipo, quantidade, motivo, usuario, transferencia)
+            conn.commit()
+            return True
+            
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            conn.close()
+    
+    def registrar_movimentacoes(self, movimentacoes, usuario="streamlit"):
+        """Registra um lote de movimentações numa única transação (tudo ou nada).
+        
+        Cada item é um dict com codigo, tipo, quantidade e motivo (opcional).
+        Retorna a lista de saldos resultantes, na ordem do lote.
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        saldos = []
+        
+        try:
+            for i, mov in enumerate(movimentacoes):
+                try:
+                    saldos.append(self._aplicar_movimentacao(
+                        cursor, mov['codigo'], mov['tipo'], mov['quantidade'], mov.get('motivo', ''), usuario
+                    ))
+                except KeyError as e:
+                    raise ValueError(f"Movimentação {i}: campo obrigatório ausente {e}")
+                except ValueError as e:
+                    raise ValueError(f"Movimentação {i}: {e}")
+            conn.commit()
+            return saldos
+            
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            conn.close()
+    
+    def obter_historico(self, codigo=None, dias=30, limite=None, offset=0):
+        conn = sqlite3.connect(self.db_path)
+        paginacao = (-1 if limite is None else limite, offset)
+        
+        if codigo:
+            query = '''
+                SELECT DATE(data_hora) as data, saldo_atual, codigo_produto
+                FROM movimentacoes 
+                WHERE codigo_produto = ? AND data_hora >= datetime('now', '-{} days')
+                ORDER BY data_hora, id
+                LIMIT ? OFFSET ?
+            '''.format(dias)
+            df = pd.read_sql_query(query, conn, params=(codigo,) + paginacao)
+        else:
+            query = '''
+                SELECT data_hora, codigo_produto, tipo, quantidade, motivo, saldo_atual
+                FROM movimentacoes 
+                WHERE data_hora >= datetime('now', '-{} days')
+                ORDER BY data_hora DESC, id DESC
+                LIMIT ? OFFSET ?
+            '''.format(dias)
+            df = pd.read_sql_query(query, conn, params=paginacao)
+        
+        conn.close()
+        return df
+
+    def _buscar_por_inicio(self, cursor, termo, limite):
+        """Produtos cujo código ou nome começa com o termo: faixas nos índices de codigo e nome"""
+        variantes = list(dict.fromkeys([termo, termo.upper(), termo.capitalize(), termo.lower()]))
+        linhas, vistos = [], set()
+        for coluna in ('codigo', 'nome'):
+            for variante in variantes:
+                fim = variante[:-1] + chr(ord(variante[-1]) + 1)
+                cursor.execute(f'''
+                    SELECT codigo, nome, categoria FROM produtos
+                    WHERE {coluna} >= ? AND {coluna} < ?
+                    ORDER BY {coluna} LIMIT ?
+                ''', (variante, fim, limite))
+                for linha in cursor.fetchall():
+                    if linha[0] not in vistos:
+                        vistos.add(linha[0])
+                        linhas.append(linha)
+                if len(linhas) >= limite:
+                    return linhas[:limite]
+        return linhas
+    
+    def buscar_produtos(self, termo="", limite=20):
+        """Busca por prefixo em codigo/nome/categoria, ordenada por relevância.
+        
+        Primeiro vêm os produtos cujo código ou nome começa com o termo (código exato
+        no topo), lidos por faixa nos índices; só se faltarem resultados a busca
+        completa (FTS ou LIKE) procura o termo no meio do nome e na categoria.
+        """
+        conn = sqlite3.connect(self.db_path)
+        colunas = ['codigo', 'nome', 'categoria']
+        termo = termo.strip()
+        palavras = [p.replace('"', '""') for p in termo.split()]
+        
+        if not palavras:
+            df = pd.read_sql_query('''
+                SELECT codigo, nome, categoria FROM produtos ORDER BY nome LIMIT ?
+            ''', conn, params=(limite,))
+            conn.close()
+            return df
+        
+        inicio = self._buscar_por_inicio(conn.cursor(), termo, limite)
+        if len(inicio) >= limite:
+            conn.close()
+            return pd.DataFrame(inicio, columns=colunas)
+        
+        if self.fts_disponivel:
+            # Cada palavra vira um prefixo ("abc"*). Só um lote limitado de candidatos é
+            # lido e ordenado: o bm25 conta todos os casamentos de cada termo (IDF), o que
+            # em termos comuns percorreria boa parte do catálogo. Prefixos de mais de 3
+            # letras não têm índice próprio e juntam todos os termos que casam, então as
+            # palavras inteiras ("abcd", sem *) são tentadas antes
+            consultas = [" ".join(f'"{p}"*' for p in palavras)]
+            if any(len(p) > 3 for p in palavras):
+                consultas.insert(0, " ".join(f'"{p}"' for p in palavras))
+            for consulta in consultas:
+                resto = pd.read_sql_query('''
+                    SELECT p.codigo, p.nome, p.categoria
+                    FROM (
+                        SELECT rowid FROM produtos_fts
+                        WHERE produtos_fts MATCH ?
+                        LIMIT ?
+                    ) f
+                    JOIN produtos p ON p.rowid = f.rowid
+                    ORDER BY length(p.nome), p.nome
+                    LIMIT ?
+                ''', conn, params=(consulta, max(limite, BUSCA_MAX_CANDIDATOS), limite))
+                if len(inicio) + len(resto) >= limite:
+                    break
+        else:
+            padrao = f"%{termo}%"
+            resto = pd.read_sql_query('''
+                SELECT codigo, nome, categoria FROM produtos
+                WHERE codigo LIKE ? OR nome LIKE ? OR categoria LIKE ?
+                ORDER BY nome LIMIT ?
+            ''', conn, params=(padrao, padrao, padrao, limite))
+        conn.close()
+        
+        if not inicio:
+            return resto
+        inicio = pd.DataFrame(inicio, columns=colunas)
+        resto = resto[~resto['codigo'].isin(inicio['codigo'])]
+        return pd.concat([inicio, resto], ignore_index=True).head(limite)
+    
+    def obter_contadores_status(self):
+        """Totais por status lidos dos contadores mantidos pelos triggers"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT status, total FROM contadores_status")
+        contadores = dict(cursor.fetchall())
+        conn.close()
+        return {status: contadores.get(status, 0) for status in STATUS_ORDEM}
+    
+    def ultimo_alerta_id(self):
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM alertas")
+        ultimo_id = cursor.fetchone()[0]
+        conn.close()
+        return ultimo_id
+    
+    def obter_alerta_visto(self, leitor="dashboard"):
+        """Último alerta visto pelo leitor; na primeira vez começa no alerta mais recente"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT ultimo_id FROM alertas_vistos WHERE leitor = ?", (leitor,))
+        linha = cursor.fetchone()
+        if linha is None:
+            # Só o primeiro acesso do leitor escreve (e pega o lock de escrita)
+            cursor.execute('''
+                INSERT OR IGNORE INTO alertas_vistos (leitor, ultimo_id)
+                SELECT ?, COALESCE(MAX(id), 0) FROM alertas
+            ''', (leitor,))
+            conn.commit()
+            cursor.execute("SELECT ultimo_id FROM alertas_vistos WHERE leitor = ?", (leitor,))
+            linha = cursor.fetchone()
+        conn.close()
+        return linha[0]
+    
+    def marcar_alertas_vistos(self, ultimo_id, leitor="dashboard"):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('''
+            INSERT INTO alertas_vistos (leitor, ultimo_id) VALUES (?, ?)
+            ON CONFLICT (leitor) DO UPDATE SET ultimo_id = MAX(ultimo_id, excluded.ultimo_id)
+        ''', (leitor, ultimo_id))
+        conn.commit()
+        conn.close()
+    
+    def resumo_alertas(self, desde_id=0):
+        """Quantidade de transições desde o último alerta visto, agrupada por status"""
+        conn = sqlite3.connect(self.db_path)
+        df = pd.read_sql_query('''
+            SELECT status_anterior, status_novo, COUNT(*) as quantidade
+            FROM alertas
+            WHERE id > ?
+            GROUP BY status_anterior, status_novo
+        ''', conn, params=(desde_id,))
+        conn.close()
+        return df
+    
+    def obter_alertas(self, desde_id=0, limite=20, offset=0, status=None):
+        """Página do feed de alertas (mais recentes primeiro)"""
+        conn = sqlite3.connect(self.db_path)
+        filtro_status = "AND a.status_novo = ?" if status else ""
+        params = (desde_id, status, limite, offset) if status else (desde_id, limite, offset)
+        df = pd.read_sql_query('''
+            SELECT a.id, a.data_hora, a.codigo_produto, p.nome, a.status_anterior, a.status_novo,
+                   a.estoque_atual, a.estoque_min
+            FROM alertas a
+            LEFT JOIN produtos p ON p.codigo = a.codigo_produto
+            WHERE a.id > ? {}
+            ORDER BY a.id DESC
+            LIMIT ? OFFSET ?
+        '''.format(filtro_status), conn, params=params)
+        conn.close()
+        return df
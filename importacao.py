@@ -0,0 +1,401 @@
+import argparse
+import sqlite3
+from itertools import chain
+
+import pandas as pd
+
+from estoque_db import EstoqueDB
+from status_estoque import status_sql
+
+# Tamanho padrão dos blocos lidos/gravados por vez (linhas)
+TAMANHO_BLOCO = 50000
+
+# Índices/triggers só são removidos e recriados no final quando o primeiro bloco vem
+# cheio e tem ao menos esta fração do tamanho da tabela (carga em massa); importações
+# pequenas gravam pelo caminho indexado e o dashboard/API seguem consultando com índices
+FRACAO_ADIAR_INDICES = 0.1
+
+COLUNAS_PRODUTOS = ['codigo', 'nome', 'categoria', 'estoque_atual', 'estoque_min', 'estoque_max', 'custo_unitario']
+COLUNAS_MOVIMENTACOES = ['data_hora', 'codigo_produto', 'tipo', 'quantidade', 'motivo', 'saldo_anterior', 'saldo_atual', 'usuario']
+
+# A partir do pandas 2, to_datetime fixa o formato da primeira linha; 'mixed' interpreta cada data
+FORMATO_DATAS = {'format': 'mixed'} if int(pd.__version__.split('.')[0]) >= 2 else {}
+
+
+def detectar_formato(arquivo, formato=None):
+    """Retorna 'csv' ou 'xlsx' a partir do formato informado ou da extensão do arquivo"""
+    if formato:
+        return formato.lower()
+    nome = str(getattr(arquivo, 'name', arquivo)).lower()
+    return 'xlsx' if nome.endswith(('.xlsx', '.xlsm')) else 'csv'
+
+
+def ler_em_blocos(arquivo, formato=None, tamanho_bloco=TAMANHO_BLOCO):
+    """Lê um CSV/XLSX em DataFrames de até tamanho_bloco linhas, sem carregar o arquivo inteiro"""
+    if detectar_formato(arquivo, formato) == 'xlsx':
+        from openpyxl import load_workbook
+
+        wb = load_workbook(arquivo, read_only=True, data_only=True)
+        try:
+            linhas = wb.active.iter_rows(values_only=True)
+            cabecalho = [str(c).strip() if c is not None else '' for c in next(linhas, ())]
+            bloco = []
+            for linha in linhas:
+                bloco.append(linha)
+                if len(bloco) >= tamanho_bloco:
+                    yield pd.DataFrame(bloco, columns=cabecalho)
+                    bloco = []
+            if bloco:
+                yield pd.DataFrame(bloco, columns=cabecalho)
+        finally:
+            wb.close()
+    else:
+        for bloco in pd.read_csv(arquivo, chunksize=tamanho_bloco, dtype=str, keep_default_na=False, na_values=['']):
+            bloco.columns = [c.strip() for c in bloco.columns]
+            yield bloco
+
+
+def _abrir_conexao_importacao(db):
+    conn = sqlite3.connect(db.db_path)
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("PRAGMA cache_size = -65536")  # 64 MB
+    conn.execute("PRAGMA temp_store = MEMORY")
+    return conn
+
+
+def _adiar_indices(cursor, tabela, primeiro, tamanho_bloco, adiar_indices=None):
+    """Decide se a importação remove os índices e os recria no final (None = automático)"""
+    if adiar_indices is not None:
+        return adiar_indices
+    if primeiro is None or len(primeiro) < tamanho_bloco:
+        return False
+    cursor.execute(f"SELECT COALESCE(MAX(rowid), 0) FROM {tabela}")
+    return len(primeiro) >= FRACAO_ADIAR_INDICES * cursor.fetchone()[0]
+
+
+def _limpar_produtos(df):
+    missing_cols = [col for col in ['codigo', 'nome'] if col not in df.columns]
+    if missing_cols:
+        raise ValueError(f"Colunas faltando no arquivo: {missing_cols}")
+
+    df = df.dropna(subset=['codigo', 'nome']).copy()
+    df['codigo'] = df['codigo'].astype(str).str.strip()
+    df['nome'] = df['nome'].astype(str).str.strip()
+    df['categoria'] = df['categoria'] if 'categoria' in df.columns else None
+    for col in ['estoque_atual', 'estoque_min', 'estoque_max', 'custo_unitario']:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+        else:
+            df[col] = 0
+    df[['estoque_atual', 'estoque_min', 'estoque_max']] = df[['estoque_atual', 'estoque_min', 'estoque_max']].astype('int64')
+    df['custo_unitario'] = df['custo_unitario'].astype('float64')
+    return df[COLUNAS_PRODUTOS]
+
+
+def _sql_upsert_produtos(colunas_arquivo):
+    # Só sobrescreve as colunas presentes no arquivo
+    atualizar = [col for col in COLUNAS_PRODUTOS[1:] if col in colunas_arquivo]
+    return '''
+        INSERT INTO produtos (codigo, nome, categoria, estoque_atual, estoque_min, estoque_max, custo_unitario)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (codigo) DO UPDATE SET {}
+    '''.format(", ".join(f"{col} = excluded.{col}" for col in atualizar))
+
+
+def importar_produtos(db, arquivo, modo='inserir', formato=None, tamanho_bloco=TAMANHO_BLOCO, progresso=None,
+                      adiar_indices=None):
+    """Importa um catálogo de produtos em blocos.
+
+    modo='inserir' ignora códigos já cadastrados (contados em resumo['ignoradas']);
+    modo='upsert' atualiza os existentes. resumo['linhas'] conta só as linhas gravadas.
+    Em cargas em massa (ver _adiar_indices) o índice de busca é reconstruído uma única
+    vez no final; nas demais, os triggers o mantêm atualizado linha a linha.
+    """
+    if modo not in ('inserir', 'upsert'):
+        raise ValueError("modo deve ser 'inserir' ou 'upsert'")
+
+    sql_insert = '''
+        INSERT OR IGNORE INTO produtos (codigo, nome, categoria, estoque_atual, estoque_min, estoque_max, custo_unitario)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    '''
+
+    blocos = ler_em_blocos(arquivo, formato, tamanho_bloco)
+    primeiro = next(blocos, None)
+    conn = _abrir_conexao_importacao(db)
+    cursor = conn.cursor()
+    resumo = {'linhas': 0, 'rejeitadas': 0, 'ignoradas': 0}
+    adiar = _adiar_indices(cursor, 'produtos', primeiro, tamanho_bloco, adiar_indices)
+
+    try:
+        if adiar:
+            db.invalidar_schema(cursor)
+            db.remover_triggers_busca(cursor)
+            conn.commit()
+
+        for bloco in ([] if primeiro is None else chain([primeiro], blocos)):
+            limpo = _limpar_produtos(bloco)
+            sql = _sql_upsert_produtos(bloco.columns) if modo == 'upsert' else sql_insert
+            cursor.executemany(sql, limpo.itertuples(index=False, name=None))
+            # rowcount soma só as linhas realmente inseridas/atualizadas (não as ignoradas)
+            gravadas = max(cursor.rowcount, 0)
+            conn.commit()
+
+            resumo['linhas'] += gravadas
+            resumo['ignoradas'] += len(limpo) - gravadas
+            resumo['rejeitadas'] += len(bloco) - len(limpo)
+            if progresso:
+                progresso(resumo)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        # Recria índices e triggers mesmo se a importação falhar no meio
+        if adiar:
+            db.reconstruir_indice_busca(cursor)
+            db.marcar_schema_atual(cursor)
+            conn.commit()
+        conn.close()
+
+    return resumo
+
+
+def _ultimos_saldos(cursor):
+    """Saldo de partida de cada produto cadastrado: último saldo movimentado ou, sem movimentações, o estoque_atual"""
+    cursor.execute('''
+        SELECT p.codigo, COALESCE(m.saldo_atual, p.estoque_atual)
+        FROM produtos p
+        LEFT JOIN movimentacoes m
+            ON m.id = (SELECT MAX(id) FROM movimentacoes WHERE codigo_produto = p.codigo)
+    ''')
+    return dict(cursor.fetchall())
+
+
+def _limpar_movimentacoes(df, saldos):
+    """Valida e completa um bloco de movimentações.
+
+    saldos ({codigo: saldo}) define os produtos cadastrados e é atualizado com o
+    último saldo de cada produto do bloco. Linhas com data inválida, tipo
+    desconhecido, quantidade não inteira ou <= 0, ou produto não cadastrado são descartadas.
+    """
+    missing_cols = [col for col in ['data_hora', 'codigo_produto', 'tipo', 'quantidade'] if col not in df.columns]
+    if missing_cols:
+        raise ValueError(f"Colunas faltando no arquivo: {missing_cols}")
+
+    df = df.copy()
+    df['data_hora'] = pd.to_datetime(df['data_hora'], errors='coerce', **FORMATO_DATAS)
+    df['codigo_produto'] = df['codigo_produto'].astype('string').str.strip()
+    df['tipo'] = df['tipo'].astype(str).str.strip().str.lower()
+    df['quantidade'] = pd.to_numeric(df['quantidade'], errors='coerce')
+    df = df[
+        df['data_hora'].notna()
+        & df['codigo_produto'].isin(saldos.keys()).fillna(False)
+        & df['tipo'].isin(['entrada', 'saida'])
+        & (df['quantidade'] > 0).fillna(False)
+        & (df['quantidade'] % 1 == 0).fillna(False)
+    ].copy()
+
+    df['codigo_produto'] = df['codigo_produto'].astype(str)
+    df['data_hora'] = df['data_hora'].dt.strftime('%Y-%m-%d %H:%M:%S')
+    df['quantidade'] = df['quantidade'].astype('int64')
+    df['motivo'] = df['motivo'] if 'motivo' in df.columns else ''
+    df['usuario'] = df['usuario'] if 'usuario' in df.columns else 'importacao'
+
+    variacao = df['quantidade'].where(df['tipo'] == 'entrada', -df['quantidade'])
+    if 'saldo_atual' in df.columns:
+        df['saldo_atual'] = pd.to_numeric(df['saldo_atual'], errors='coerce')
+    else:
+        df['saldo_atual'] = float('nan')
+
+    # Sem saldo no arquivo: saldo corrente por produto, continuando do último saldo conhecido
+    sem_saldo = df['saldo_atual'].isna()
+    if sem_saldo.any():
+        base = df.loc[sem_saldo, 'codigo_produto'].map(saldos)
+        acumulado = variacao[sem_saldo].groupby(df.loc[sem_saldo, 'codigo_produto']).cumsum()
+        df.loc[sem_saldo, 'saldo_atual'] = base + acumulado
+    df['saldo_atual'] = df['saldo_atual'].astype('int64')
+
+    if 'saldo_anterior' in df.columns:
+        df['saldo_anterior'] = pd.to_numeric(df['saldo_anterior'], errors='coerce')
+        df['saldo_anterior'] = df['saldo_anterior'].fillna(df['saldo_atual'] - variacao).astype('int64')
+    else:
+        df['saldo_anterior'] = df['saldo_atual'] - variacao
+
+    saldos.update(df.groupby('codigo_produto')['saldo_atual'].last().to_dict())
+    return df[COLUNAS_MOVIMENTACOES]
+
+
+def importar_movimentacoes(db, arquivo, formato=None, tamanho_bloco=TAMANHO_BLOCO, atualizar_estoque=False, progresso=None,
+                           adiar_indices=None):
+    """Importa histórico de movimentações em blocos, uma transação por bloco.
+
+    O arquivo deve estar em ordem cronológica por produto e só aceita produtos já
+    cadastrados. Quando não traz saldo_atual, o saldo é calculado a partir do último
+    saldo registrado do produto (ou do estoque_atual, se ele não tem movimentações).
+    Com atualizar_estoque=True, o estoque_atual dos produtos passa a ser o último saldo importado.
+    Os índices de movimentacoes só são removidos e recriados no final em cargas em massa.
+    """
+    blocos = ler_em_blocos(arquivo, formato, tamanho_bloco)
+    primeiro = next(blocos, None)
+    conn = _abrir_conexao_importacao(db)
+    cursor = conn.cursor()
+    resumo = {'linhas': 0, 'rejeitadas': 0}
+    saldos = _ultimos_saldos(cursor)
+    importados = set()
+    adiar = _adiar_indices(cursor, 'movimentacoes', primeiro, tamanho_bloco, adiar_indices)
+
+    try:
+        if adiar:
+            db.invalidar_schema(cursor)
+            db.remover_indices_movimentacoes(cursor)
+            conn.commit()
+
+        for bloco in ([] if primeiro is None else chain([primeiro], blocos)):
+            limpo = _limpar_movimentacoes(bloco, saldos)
+            cursor.executemany('''
+                INSERT INTO movimentacoes (data_hora, codigo_produto, tipo, quantidade, motivo,
+                                           saldo_anterior, saldo_atual, usuario)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', limpo.itertuples(index=False, name=None))
+            conn.commit()
+
+            importados.update(limpo['codigo_produto'].unique())
+            resumo['linhas'] += len(limpo)
+            resumo['rejeitadas'] += len(bloco) - len(limpo)
+            if progresso:
+                progresso(resumo)
+
+        if atualizar_estoque:
+            cursor.executemany(
+                "UPDATE produtos SET estoque_atual = ? WHERE codigo = ?",
+                ((saldos[codigo], codigo) for codigo in importados)
+            )
+            conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        if adiar:
+            db.criar_indices_movimentacoes(cursor)
+            db.marcar_schema_atual(cursor)
+            conn.commit()
+        conn.close()
+
+    return resumo
+
+
+def exportar_consulta(db, sql, destino, params=(), formato=None, tamanho_bloco=TAMANHO_BLOCO):
+    """Grava o resultado de uma consulta em CSV/XLSX bloco a bloco. Retorna o número de linhas"""
+    formato = detectar_formato(destino, formato)
+    conn = sqlite3.connect(db.db_path)
+    total = 0
+
+    try:
+        blocos = pd.read_sql_query(sql, conn, params=params, chunksize=tamanho_bloco)
+
+        if formato == 'xlsx':
+            from openpyxl import Workbook
+
+            wb = Workbook(write_only=True)
+            ws = wb.create_sheet()
+            cabecalho_escrito = False
+            for bloco in blocos:
+                if not cabecalho_escrito:
+                    ws.append(list(bloco.columns))
+                    cabecalho_escrito = True
+                for linha in bloco.itertuples(index=False, name=None):
+                    ws.append(linha)
+                total += len(bloco)
+            wb.save(destino)
+        else:
+            primeiro = True
+            for bloco in blocos:
+                bloco.to_csv(destino, mode='w' if primeiro else 'a', header=primeiro, index=False, encoding='utf-8')
+                primeiro = False
+                total += len(bloco)
+    finally:
+        conn.close()
+
+    return total
+
+
+def exportar_produtos(db, destino, categoria=None, status=None, formato=None):
+    filtros, params = [], []
+    if categoria:
+        filtros.append("categoria = ?")
+        params.append(categoria)
+    if status:
+        filtros.append(f"{status_sql('produtos')} = ?")
+        params.append(status)
+
+    sql = '''
+        SELECT codigo, nome, categoria, estoque_atual, estoque_min, estoque_max, custo_unitario,
+               {} AS status
+        FROM produtos {} ORDER BY nome
+    '''.format(status_sql('produtos'), "WHERE " + " AND ".join(filtros) if filtros else "")
+    return exportar_consulta(db, sql, destino, tuple(params), formato)
+
+
+def exportar_movimentacoes(db, destino, codigo=None, dias=None, formato=None):
+    filtros, params = [], []
+    if codigo:
+        filtros.append("codigo_produto = ?")
+        params.append(codigo)
+    if dias:
+        filtros.append("data_hora >= datetime('now', ?)")
+        params.append(f"-{int(dias)} days")
+
+    sql = '''
+        SELECT data_hora, codigo_produto, tipo, quantidade, motivo, saldo_anterior, saldo_atual, usuario
+        FROM movimentacoes {} ORDER BY data_hora
+    '''.format("WHERE " + " AND ".join(filtros) if filtros else "")
+    return exportar_consulta(db, sql, destino, tuple(params), formato)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importação/exportação em massa do estoque (CSV/XLSX)")
+    parser.add_argument('--db', default='estoque.db', help="Caminho do banco SQLite")
+    parser.add_argument('--adiar-indices', action=argparse.BooleanOptionalAction, default=None,
+                        help="Remove os índices durante a importação e os recria no final (padrão: automático)")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    p = sub.add_parser('importar-produtos')
+    p.add_argument('arquivo')
+    p.add_argument('--upsert', action='store_true', help="Atualiza produtos já cadastrados")
+
+    p = sub.add_parser('importar-movimentacoes')
+    p.add_argument('arquivo')
+    p.add_argument('--atualizar-estoque', action='store_true', help="Ajusta estoque_atual ao último saldo importado")
+
+    p = sub.add_parser('exportar-produtos')
+    p.add_argument('destino')
+    p.add_argument('--categoria')
+    p.add_argument('--status', choices=['OK', 'ATENÇÃO', 'CRÍTICO'])
+
+    p = sub.add_parser('exportar-movimentacoes')
+    p.add_argument('destino')
+    p.add_argument('--codigo')
+    p.add_argument('--dias', type=int)
+
+    args = parser.parse_args()
+    db = EstoqueDB(args.db)
+    progresso = lambda r: print(f"  {r['linhas']} linhas importadas...", flush=True)
+
+    if args.comando == 'importar-produtos':
+        resumo = importar_produtos(db, args.arquivo, 'upsert' if args.upsert else 'inserir', progresso=progresso,
+                                   adiar_indices=args.adiar_indices)
+        print(f"✅ {resumo['linhas']} produtos importados ({resumo['ignoradas']} já cadastrados ignorados, "
+              f"{resumo['rejeitadas']} linhas rejeitadas)")
+    elif args.comando == 'importar-movimentacoes':
+        resumo = importar_movimentacoes(db, args.arquivo, atualizar_estoque=args.atualizar_estoque, progresso=progresso,
+                                        adiar_indices=args.adiar_indices)
+        print(f"✅ {resumo['linhas']} movimentações importadas ({resumo['rejeitadas']} linhas rejeitadas)")
+    elif args.comando == 'exportar-produtos':
+        total = exportar_produtos(db, args.destino, args.categoria, args.status)
+        print(f"✅ {total} produtos exportados para {args.destino}")
+    else:
+        total = exportar_movimentacoes(db, args.destino, args.codigo, args.dias)
+        print(f"✅ {total} movimentações exportadas para {args.destino}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from estoque_db import EstoqueDB
+from status_estoque import SEMAFOROS, classificar_status
+
+# Diretório padrão dos bancos de cada depósito (um arquivo SQLite por depósito)
+DIRETORIO_DEPOSITOS = "depositos"
+
+
+def depositos_configurados():
+    """Depósitos definidos em ESTOQUE_DEPOSITOS (ex: "central,norte,sul"); vazio = modo único"""
+    return [d.strip() for d in os.environ.get("ESTOQUE_DEPOSITOS", "").split(",") if d.strip()]
+
+
+class EstoqueMultiDeposito:
+    """Estoque distribuído em vários depósitos, cada um com o próprio banco SQLite.
+
+    Cada depósito é um EstoqueDB completo (produtos, movimentações, alertas), com
+    estoque_atual referente àquele local e lock de escrita independente.
+    Escritas são roteadas pelo depósito; as visões do catálogo inteiro consultam
+    todos os depósitos em paralelo e juntam os resultados.
+
+    O catálogo é replicado em todos os depósitos: só o primeiro recebe os dados
+    de demonstração, e sincronizar_catalogo (ao abrir e depois de importar
+    produtos) cadastra em cada depósito, com estoque zero, os produtos que só
+    existem nos outros. transferir cadastra o produto no destino se faltar.
+    """
+
+    def __init__(self, depositos, diretorio=DIRETORIO_DEPOSITOS):
+        if not depositos:
+            raise ValueError("Informe ao menos um depósito")
+        os.makedirs(diretorio, exist_ok=True)
+
+        self.locais = list(depositos)
+        # Estoque de cada depósito na visão consolidada
+        self.colunas_estoque = {local: f"estoque_{local}" for local in self.locais}
+        self.shards = {}
+        for local in self.locais:
+            db = EstoqueDB(os.path.join(diretorio, f"estoque_{local}.db"), dados_iniciais=local == self.locais[0])
+            db.ativar_wal()
+            self.shards[local] = db
+
+        # sqlite3 libera o GIL durante as consultas: threads bastam para paralelizar
+        self.executor = ThreadPoolExecutor(max_workers=len(self.locais), thread_name_prefix="deposito")
+        self.sincronizar_catalogo()
+
+    def deposito(self, local):
+        if local not in self.shards:
+            raise ValueError(f"Depósito {local} não encontrado")
+        return self.shards[local]
+
+    def em_paralelo(self, funcao, *args):
+        """Executa funcao(shard, *args) em todos os depósitos; retorna {local: resultado}"""
+        futuros = {local: self.executor.submit(funcao, db, *args) for local, db in self.shards.items()}
+        return {local: futuro.result() for local, futuro in futuros.items()}
+
+    def sincronizar_catalogo(self, origem=None):
+        """Cadastra em cada depósito os produtos que faltam (estoque zero); retorna {local: alterados}.
+
+        Com origem (ex: depósito que acabou de importar produtos), nome, categoria
+        e custo dessa origem também são atualizados nos demais.
+        """
+        catalogos = self.em_paralelo(lambda db: db.obter_catalogo())
+        ordem = self.locais if origem is None else [origem] + [l for l in self.locais if l != origem]
+        # Em códigos repetidos vale o cadastro da origem (ou do primeiro depósito)
+        catalogo = pd.concat([catalogos[local] for local in ordem], ignore_index=True).drop_duplicates('codigo')
+
+        def sincronizar(db, local):
+            if origem is not None and local != origem:
+                return db.sincronizar_cadastro(catalogo, atualizar=True)
+            faltando = catalogo[~catalogo['codigo'].isin(catalogos[local]['codigo'])]
+            return db.sincronizar_cadastro(faltando) if len(faltando) else 0
+
+        futuros = {local: self.executor.submit(sincronizar, db, local) for local, db in self.shards.items()}
+        return {local: futuro.result() for local, futuro in futuros.items()}
+
+    def transferir(self, codigo, origem, destino, quantidade, motivo="", usuario="streamlit"):
+        """Transfere estoque entre depósitos: saída na origem e entrada no destino.
+
+        Os bancos são independentes, então não há transação única: se a entrada
+        no destino falhar, a saída na origem é estornada.
+        """
+        if origem == destino:
+            raise ValueError("Origem e destino devem ser depósitos diferentes")
+        db_origem, db_destino = self.deposito(origem), self.deposito(destino)
+        sufixo = f" - {motivo}" if motivo else ""
+
+        # Produto sem cadastro no destino: copia o cadastro da origem (estoque zero)
+        db_destino.sincronizar_cadastro(db_origem.obter_catalogo([codigo]))
+
+        db_origem.registrar_movimentacao(codigo, "saida", quantidade, f"Transferência para {destino}{sufixo}", usuario, transferencia=True)
+        try:
+            db_destino.registrar_movimentacao(codigo, "entrada", quantidade, f"Transferência de {origem}{sufixo}", usuario, transferencia=True)
+        except Exception:
+            db_origem.registrar_movimentacao(codigo, "entrada", quantidade, f"Estorno de transferência para {destino}", usuario, transferencia=True)
+            raise
+        return True
+
+    # Leituras com fan-out
+    def versao_dados(self):
+        versoes = self.em_paralelo(lambda db: db.versao_dados())
+        return "|".join(f"{local}:{versoes[local]}" for local in self.locais)
+
+    def obter_por_deposito(self):
+        """Produtos de todos os depósitos, uma linha por (depósito, produto)"""
+        partes = self.em_paralelo(lambda db: db.obter_produtos())
+        return pd.concat(
+            [partes[local].assign(deposito=local) for local in self.locais],
+            ignore_index=True
+        )
+
+    def obter_produtos(self):
+        """Visão consolidada: estoque, mínimo e máximo somados, mais o estoque de cada depósito"""
+        colunas = ['codigo', 'nome', 'categoria', 'estoque_atual', 'estoque_min', 'estoque_max', 'custo_unitario', 'deposito']
+        todos = self.obter_por_deposito()[colunas]
+
+        df = todos.groupby('codigo', sort=False, as_index=False).agg(
+            nome=('nome', 'first'),
+            categoria=('categoria', 'first'),
+            estoque_atual=('estoque_atual', 'sum'),
+            estoque_min=('estoque_min', 'sum'),
+            estoque_max=('estoque_max', 'sum'),
+            custo_unitario=('custo_unitario', 'first')
+        ).sort_values('nome', ignore_index=True)
+
+        por_deposito = todos.pivot(index='codigo', columns='deposito', values='estoque_atual')
+        por_deposito = por_deposito.reindex(index=df['codigo'], columns=self.locais).fillna(0).astype('int64')
+        for local, coluna in self.colunas_estoque.items():
+            df[coluna] = por_deposito[local].to_numpy()
+
+        df['status'] = classificar_status(df['estoque_atual'], df['estoque_min'])
+        df['semaforo'] = df['status'].map(SEMAFOROS)
+        return df
+
+    def obter_historico(self, codigo=None, dias=30, limite=None, offset=0):
+        """Histórico de todos os depósitos (coluna deposito); limite/offset valem para o resultado combinado"""
+        # A página combinada está entre as offset + limite primeiras linhas de cada depósito
+        por_deposito = None if limite is None else offset + limite
+        partes = self.em_paralelo(lambda db: db.obter_historico(codigo, dias, limite=por_deposito))
+        df = pd.concat(
+            [partes[local].assign(deposito=local) for local in self.locais],
+            ignore_index=True
+        )
+        ordem = 'data' if codigo else 'data_hora'
+        df = df.sort_values(ordem, ascending=bool(codigo), kind='stable', ignore_index=True)
+        fim = None if limite is None else offset + limite
+        return df.iloc[offset:fim].reset_index(drop=True)
@@ -0,0 +1,69 @@
+import pandas as pd
+
+from status_estoque import STATUS_ORDEM, SEMAFOROS
+
+# Com Copy-on-Write, seleções de colunas e fatias do quadro compartilhado não copiam
+# os dados e nenhuma sessão consegue alterá-lo por engano (padrão a partir do pandas 3)
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+COLUNAS_INTEIRAS = ['estoque_atual', 'estoque_min', 'estoque_max']
+
+# Colunas da tabela de semáforos exibida pelos dashboards
+COLUNAS_TABELA = ['semaforo', 'codigo', 'nome', 'categoria', 'estoque_atual', 'estoque_min', 'status']
+
+
+def compactar_produtos(df):
+    """Versão compacta do quadro de produtos: categorias e numéricos reduzidos.
+
+    categoria/status/semaforo viram Categorical (poucos valores distintos);
+    codigo e nome continuam como texto, pois são praticamente únicos.
+    custo_unitario fica em float64: em float32, 42.80 vira 42.7999992 e os
+    custos somados (custo médio, custo da sugestão de compra) erram centavos.
+    """
+    compacto = pd.DataFrame(index=pd.RangeIndex(len(df)))
+    for col in df.columns:
+        valores = df[col].reset_index(drop=True)
+        if col == 'status':
+            compacto[col] = pd.Categorical(valores, categories=STATUS_ORDEM)
+        elif col == 'semaforo':
+            compacto[col] = pd.Categorical(valores, categories=[SEMAFOROS[s] for s in STATUS_ORDEM])
+        elif col == 'categoria':
+            compacto[col] = valores.astype('category')
+        elif col in COLUNAS_INTEIRAS:
+            compacto[col] = pd.to_numeric(valores, downcast='integer')
+        else:
+            compacto[col] = valores
+    return compacto
+
+
+def bytes_quadro(df):
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+def relatorio_memoria(original, compacto, copias_completas=0):
+    """Comparação de memória entre o quadro por sessão e o compartilhado compacto.
+
+    Antes, cada sessão alocava o quadro original, `copias_completas` cópias dele
+    (df.copy()) e a projeção das COLUNAS_TABELA (copiada sem Copy-on-Write);
+    agora todas as sessões apontam para um único quadro compacto por versão dos
+    dados. O Styler não entra na conta.
+    """
+    bytes_original = bytes_quadro(original)
+    bytes_compacto = bytes_quadro(compacto)
+    colunas_tabela = [col for col in COLUNAS_TABELA if col in original.columns]
+    bytes_por_sessao = bytes_original * (1 + copias_completas) + bytes_quadro(original[colunas_tabela])
+    return {
+        'linhas': len(original),
+        'bytes_original': bytes_original,
+        'bytes_compacto': bytes_compacto,
+        'bytes_economizados_por_sessao': bytes_por_sessao,
+        'reducao_percentual': 100 * (1 - bytes_compacto / bytes_original) if bytes_original else 0.0,
+    }
+
+
+def formatar_bytes(n):
+    for unidade in ['B', 'KB', 'MB', 'GB']:
+        if abs(n) < 1024 or unidade == 'GB':
+            return f"{n:.0f} {unidade}" if unidade == 'B' else f"{n:.1f} {unidade}"
+        n /= 1024
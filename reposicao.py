@@ -0,0 +1,128 @@
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from threading import Lock
+
+import numpy as np
+import pandas as pd
+
+# Janela (dias) da média móvel de consumo
+JANELA_CONSUMO_DIAS = 30
+
+# Prazo de reposição (dias): abaixo dessa cobertura o produto entra na sugestão de compra
+PRAZO_REPOSICAO_DIAS = 7
+
+
+def _hoje_utc():
+    # data_hora é gravado com CURRENT_TIMESTAMP (UTC)
+    return datetime.now(timezone.utc).date()
+
+
+class MotorReposicao:
+    """Consumo médio, dias de cobertura, data de ruptura e sugestão de compra por produto.
+
+    O total de saídas por produto na janela é calculado numa única consulta
+    agregada (índice de consumo); depois, só as movimentações novas (id maior
+    que o último lido) são somadas. A janela é recalculada por inteiro quando o
+    dia muda, e o resultado fica em cache até a versão dos dados ou o dia mudar.
+    """
+
+    def __init__(self, db, janela_dias=JANELA_CONSUMO_DIAS, prazo_reposicao_dias=PRAZO_REPOSICAO_DIAS):
+        self.db = db
+        self.janela_dias = janela_dias
+        self.prazo_reposicao_dias = prazo_reposicao_dias
+
+        self.ultimo_id = 0
+        self.dia_janela = None
+        self.saidas = pd.Series(dtype='float64')
+        self.chave_cache = None
+        self.resultado = None
+        self.lock = Lock()
+
+    def _ler_saidas(self, inicio, desde_id=0):
+        """Saídas de consumo por produto desde `inicio`, com id entre desde_id (exclusivo) e o último id atual"""
+        conn = sqlite3.connect(self.db.db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM movimentacoes")
+        ultimo_id = cursor.fetchone()[0]
+
+        # Transferências entre depósitos (e estornos) não são consumo
+        if desde_id == 0:
+            # Janela inteira: varre o índice de consumo (tipo, transferencia, codigo_produto, ...)
+            filtro_id = "id <= ? AND tipo = 'saida' AND transferencia = 0"
+            params = (ultimo_id, inicio)
+        else:
+            # Só as novas: faixa de id pela chave primária ("+tipo" evita o índice de consumo)
+            filtro_id = "id > ? AND id <= ? AND +tipo = 'saida' AND transferencia = 0"
+            params = (desde_id, ultimo_id, inicio)
+        cursor.execute('''
+            SELECT codigo_produto, SUM(quantidade)
+            FROM movimentacoes
+            WHERE {} AND data_hora >= ?
+            GROUP BY codigo_produto
+        '''.format(filtro_id), params)
+        linhas = cursor.fetchall()
+        conn.close()
+
+        codigos = [linha[0] for linha in linhas]
+        quantidades = np.fromiter((linha[1] for linha in linhas), dtype='float64', count=len(linhas))
+        return pd.Series(quantidades, index=codigos), ultimo_id
+
+    def atualizar_consumo(self, hoje=None):
+        """Consumo médio diário por produto na janela, atualizado de forma incremental"""
+        hoje = hoje or _hoje_utc()
+        inicio = (hoje - timedelta(days=self.janela_dias - 1)).isoformat()
+
+        if hoje != self.dia_janela:
+            # Janela deslocou: recalcula tudo
+            self.saidas, self.ultimo_id = self._ler_saidas(inicio)
+            self.dia_janela = hoje
+        else:
+            novas, self.ultimo_id = self._ler_saidas(inicio, self.ultimo_id)
+            if len(novas) > 0:
+                self.saidas = self.saidas.add(novas, fill_value=0)
+
+        return self.saidas / self.janela_dias
+
+    def calcular(self, produtos_df=None, hoje=None):
+        """Tabela de reposição para todos os produtos (cacheada por versão dos dados e dia)"""
+        hoje = hoje or _hoje_utc()
+        with self.lock:
+            chave = (self.db.versao_dados(), hoje)
+            if chave == self.chave_cache:
+                return self.resultado
+
+            consumo = self.atualizar_consumo(hoje)
+            if produtos_df is None:
+                produtos_df = self.db.obter_produtos()
+
+            self.resultado = self._projetar(produtos_df, consumo, hoje)
+            self.chave_cache = chave
+            return self.resultado
+
+    def _projetar(self, produtos_df, consumo, hoje):
+        estoque = produtos_df['estoque_atual'].to_numpy(dtype='float64')
+        estoque_min = produtos_df['estoque_min'].to_numpy(dtype='float64')
+        estoque_max = produtos_df['estoque_max'].to_numpy(dtype='float64')
+        consumo_diario = produtos_df['codigo'].map(consumo).fillna(0.0).to_numpy(dtype='float64')
+
+        # Sem consumo na janela: cobertura indefinida (NaN) e sem data de ruptura
+        com_consumo = consumo_diario > 0
+        dias_cobertura = np.full(len(estoque), np.nan)
+        np.divide(estoque, consumo_diario, out=dias_cobertura, where=com_consumo)
+
+        data_ruptura = pd.Timestamp(hoje) + pd.to_timedelta(np.floor(dias_cobertura), unit='D')
+
+        # Pede até o máximo quando o estoque chega ao ponto de pedido
+        ponto_pedido = np.maximum(estoque_min, consumo_diario * self.prazo_reposicao_dias)
+        sugestao = np.where(estoque <= ponto_pedido, np.clip(estoque_max - estoque, 0, None), 0)
+
+        return pd.DataFrame({
+            'codigo': produtos_df['codigo'].to_numpy(),
+            'nome': produtos_df['nome'].to_numpy(),
+            'estoque_atual': produtos_df['estoque_atual'].to_numpy(),
+            'consumo_diario': consumo_diario.round(2),
+            'dias_cobertura': dias_cobertura.round(1),
+            'data_ruptura': data_ruptura,
+            'sugestao_compra': sugestao.astype('int64'),
+            'custo_sugestao': (sugestao * produtos_df['custo_unitario'].to_numpy(dtype='float64')).round(2),
+        })
@@ -0,0 +1,33 @@
+# Regras do semáforo (módulo leve: sem sqlite3/pandas, numpy só ao classificar)
+STATUS_ORDEM = ['CRÍTICO', 'ATENÇÃO', 'OK']
+
+def status_sql(tabela):
+    """Expressão SQL equivalente à regra de status usada em obter_produtos.
+
+    estoque_min = 0 significa produto sem mínimo definido (ex: cadastro copiado
+    para um depósito que não o estoca): fica OK mesmo com estoque zero.
+    """
+    return (
+        "(CASE WHEN {t}.estoque_min <= 0 THEN 'OK' "
+        "WHEN {t}.estoque_atual <= {t}.estoque_min THEN 'CRÍTICO' "
+        "WHEN {t}.estoque_atual <= {t}.estoque_min * 1.5 THEN 'ATENÇÃO' "
+        "ELSE 'OK' END)"
+    ).format(t=tabela)
+
+SEMAFOROS = {
+    'OK': '🟢',
+    'ATENÇÃO': '🟡',
+    'CRÍTICO': '🔴'
+}
+
+def classificar_status(estoque_atual, estoque_min):
+    """Versão vetorizada da regra de status (mesma lógica de status_sql)"""
+    import numpy as np
+
+    estoque_atual = np.asarray(estoque_atual)
+    estoque_min = np.asarray(estoque_min)
+    return np.select(
+        [estoque_min <= 0, estoque_atual <= estoque_min, estoque_atual <= estoque_min * 1.5],
+        ['OK', 'CRÍTICO', 'ATENÇÃO'],
+        default='OK'
+    )
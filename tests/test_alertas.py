@@ -0,0 +1,39 @@
+import sqlite3
+
+import pytest
+
+from estoque_db import EstoqueDB
+
+
+@pytest.fixture
+def db(tmp_path):
+    return EstoqueDB(str(tmp_path / "estoque.db"))
+
+
+def test_visto_comeca_no_alerta_mais_recente_e_e_por_leitor(db):
+    db.registrar_movimentacao("P001", "saida", 140)
+    ultimo = db.ultimo_alerta_id()
+
+    assert ultimo > 0
+    assert db.obter_alerta_visto("ana") == ultimo
+
+    db.registrar_movimentacao("P001", "entrada", 200)
+    assert db.obter_alerta_visto("ana") == ultimo
+    assert db.obter_alerta_visto("bruno") == db.ultimo_alerta_id()
+
+    db.marcar_alertas_vistos(db.ultimo_alerta_id(), "ana")
+    db.marcar_alertas_vistos(ultimo, "ana")
+    assert db.obter_alerta_visto("ana") == db.ultimo_alerta_id()
+
+
+def test_leitor_conhecido_nao_escreve(db):
+    visto = db.obter_alerta_visto("ana")
+
+    # Com outra conexão segurando o lock de escrita, a leitura não pode esperar por ele
+    conn = sqlite3.connect(db.db_path)
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        assert db.obter_alerta_visto("ana") == visto
+    finally:
+        conn.rollback()
+        conn.close()
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from amostragem import indices_cruzamentos, lttb, reduzir_serie
+
+
+def _serie(n, semente=0):
+    # Ruído em volta de 50: cruza os limites 40/60 muitas vezes
+    rng = np.random.default_rng(semente)
+    return pd.DataFrame({
+        'data': pd.date_range('2026-01-01', periods=n, freq='h'),
+        'saldo': 50 + rng.normal(0, 15, n).round(),
+    })
+
+
+@pytest.mark.parametrize("n", [2, 3, 10, 101, 5000])
+@pytest.mark.parametrize("max_pontos", [0, 1, 2, 3, 4, 7, 50, 500])
+@pytest.mark.parametrize("limites", [(), (40, 60)])
+def test_nunca_passa_de_max_pontos(n, max_pontos, limites):
+    df = _serie(n)
+
+    reduzido = reduzir_serie(df, 'data', 'saldo', max_pontos, limites)
+
+    assert len(reduzido) <= max_pontos
+    assert reduzido.index.is_monotonic_increasing and reduzido.index.is_unique
+
+
+@pytest.mark.parametrize("limites", [(), (40, 60)])
+def test_mantem_primeiro_e_ultimo(limites):
+    df = _serie(5000, semente=1)
+
+    reduzido = reduzir_serie(df, 'data', 'saldo', 100, limites)
+
+    assert reduzido.index[0] == 0 and reduzido.index[-1] == len(df) - 1
+    assert list(lttb(np.arange(5000), df['saldo'], 2)) == [0, 4999]
+
+
+def test_cruzamento_que_cabe_no_orcamento_e_mantido():
+    # Série lisa que passa abaixo do mínimo uma única vez, num trecho estreito
+    y = np.full(10000, 100.0)
+    y[6000:6003] = 5.0
+    df = pd.DataFrame({'x': np.arange(len(y)), 'saldo': y})
+
+    reduzido = reduzir_serie(df, 'x', 'saldo', 20, limites=(10,))
+
+    assert {5999, 6000, 6002, 6003} <= set(reduzido.index)
+    assert len(reduzido) <= 20
+
+
+def test_cruzamentos_limitados_por_faixa():
+    y = np.tile([0.0, 10.0], 500)
+
+    indices = indices_cruzamentos(y, [5], max_cruzamentos=4)
+
+    assert len(indices) <= 8
+    assert indices[0] == 0
@@ -0,0 +1,73 @@
+import gzip
+import http.client
+import json
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from api_estoque import QUANTIDADE_MAX, EstoqueAPI, criar_handler
+from estoque_db import EstoqueDB
+
+
+@pytest.fixture
+def api(tmp_path):
+    return EstoqueAPI(EstoqueDB(str(tmp_path / "estoque.db")))
+
+
+@pytest.fixture
+def servidor(api):
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), criar_handler(api))
+    threading.Thread(target=servidor.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+    yield servidor
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def _requisicao(servidor, metodo, caminho, corpo=None, cabecalhos=None):
+    conn = http.client.HTTPConnection(*servidor.server_address)
+    dados = None if corpo is None else json.dumps(corpo).encode()
+    conn.request(metodo, caminho, body=dados, headers=cabecalhos or {})
+    resposta = conn.getresponse()
+    resultado = resposta.status, dict(resposta.getheaders()), resposta.read()
+    conn.close()
+    return resultado
+
+
+@pytest.mark.parametrize("corpo", [
+    {"codigo": ["x"], "tipo": "entrada", "quantidade": 1},
+    {"codigo": "P001", "tipo": {"a": 1}, "quantidade": 1},
+    {"codigo": "P001", "tipo": "entrada", "quantidade": 1, "motivo": 5},
+    {"codigo": "P001", "tipo": "entrada", "quantidade": QUANTIDADE_MAX + 1},
+    {"codigo": "P001", "tipo": "entrada", "quantidade": 10 ** 30},
+    {"codigo": "P001", "tipo": "entrada", "quantidade": True},
+])
+def test_movimentacao_invalida_e_400(servidor, corpo):
+    status, _, dados = _requisicao(servidor, "POST", "/movimentacoes", corpo)
+
+    assert status == 400
+    assert "erro" in json.loads(dados)
+
+
+def test_erro_interno_nao_expoe_detalhes(servidor, api, monkeypatch, capsys):
+    def falhar(*args, **kwargs):
+        raise RuntimeError("no such table: segredo")
+
+    monkeypatch.setattr(api.db, "registrar_movimentacoes", falhar)
+    status, _, dados = _requisicao(servidor, "POST", "/movimentacoes",
+                                   {"codigo": "P001", "tipo": "entrada", "quantidade": 1})
+
+    assert status == 500
+    assert json.loads(dados) == {"erro": "Erro interno do servidor"}
+    assert "segredo" in capsys.readouterr().err
+
+
+def test_etag_fraca_vale_para_gzip_e_texto(servidor):
+    status, plano, corpo = _requisicao(servidor, "GET", "/produtos")
+    _, comprimido, corpo_gzip = _requisicao(servidor, "GET", "/produtos", cabecalhos={"Accept-Encoding": "gzip"})
+
+    assert status == 200
+    assert plano["ETag"].startswith('W/"') and plano["ETag"] == comprimido["ETag"]
+    assert comprimido.get("Content-Encoding") == "gzip" and gzip.decompress(corpo_gzip) == corpo
+    for etag in (plano["ETag"], plano["ETag"].removeprefix("W/")):
+        assert _requisicao(servidor, "GET", "/produtos", cabecalhos={"If-None-Match": etag})[0] == 304
@@ -0,0 +1,45 @@
+import sqlite3
+
+import pytest
+
+from estoque_db import EstoqueDB
+
+
+@pytest.fixture
+def db(tmp_path):
+    # Catálogo de demonstração (P001..P008) mais muitos "Parafuso" com prefixo PAR
+    db = EstoqueDB(str(tmp_path / "estoque.db"))
+    conn = sqlite3.connect(db.db_path)
+    conn.executemany(
+        '''INSERT INTO produtos (codigo, nome, categoria, estoque_atual, estoque_min, estoque_max, custo_unitario)
+           VALUES (?, ?, ?, 10, 5, 50, 1.0)''',
+        [(f"PAR{i:05d}", f"Parafuso sextavado {i}", "Ferragens") for i in range(3000)]
+        + [("PARA", "Parafuso avulso", "Ferragens")]
+    )
+    conn.commit()
+    conn.close()
+    return db
+
+
+def test_codigo_exato_vem_primeiro(db):
+    for termo in ["PARA", "para", " para "]:
+        assert db.buscar_produtos(termo, limite=5)['codigo'].iloc[0] == "PARA"
+
+
+def test_prefixo_curto_respeita_limite(db):
+    resultado = db.buscar_produtos("p", limite=20)
+
+    assert len(resultado) == 20
+    assert resultado['codigo'].str.upper().str.startswith("P").all()
+
+
+def test_termo_no_meio_do_nome_e_na_categoria(db):
+    resultado = db.buscar_produtos("sextavado 42", limite=5)
+    assert resultado['codigo'].iloc[0] == "PAR00042"
+    assert resultado['nome'].str.contains("sextavado 42").all()
+    # Categoria sem acento encontra "Eletrônicos"
+    assert set(db.buscar_produtos("eletronicos", limite=20)['codigo']) == {"P001", "P002"}
+
+
+def test_sem_resultados(db):
+    assert db.buscar_produtos("xyz").empty
@@ -0,0 +1,164 @@
+import io
+import sqlite3
+
+import pytest
+
+import importacao
+from estoque_db import EstoqueDB, SCHEMA_VERSAO
+
+
+@pytest.fixture
+def db(tmp_path):
+    # Banco novo com os produtos de demonstração (P001 começa com 150 unidades)
+    return EstoqueDB(str(tmp_path / "estoque.db"))
+
+
+def _csv(texto):
+    return io.StringIO(texto.strip() + "\n")
+
+
+def _movimentacoes(db, codigo):
+    conn = sqlite3.connect(db.db_path)
+    linhas = conn.execute(
+        "SELECT tipo, quantidade, saldo_anterior, saldo_atual FROM movimentacoes WHERE codigo_produto = ? ORDER BY id",
+        (codigo,)
+    ).fetchall()
+    conn.close()
+    return linhas
+
+
+def test_saldo_corrente_parte_do_estoque_atual(db):
+    arquivo = _csv("""
+data_hora,codigo_produto,tipo,quantidade
+2026-10-10,P001,entrada,10
+2026-10-11 08:30:00,P001,saida,25
+""")
+    resumo = importacao.importar_movimentacoes(db, arquivo, atualizar_estoque=True)
+
+    assert resumo == {'linhas': 2, 'rejeitadas': 0}
+    assert _movimentacoes(db, "P001") == [("entrada", 10, 150, 160), ("saida", 25, 160, 135)]
+    produtos = db.obter_produtos().set_index('codigo')
+    assert produtos.loc["P001", "estoque_atual"] == 135
+
+
+def test_saldo_continua_da_ultima_movimentacao(db):
+    db.registrar_movimentacao("P002", "entrada", 5)
+
+    importacao.importar_movimentacoes(db, _csv("""
+data_hora,codigo_produto,tipo,quantidade
+2026-10-12,P002,saida,3
+"""))
+
+    assert _movimentacoes(db, "P002")[-1] == ("saida", 3, 35, 32)
+
+
+def test_linhas_invalidas_sao_rejeitadas(db):
+    arquivo = _csv("""
+data_hora,codigo_produto,tipo,quantidade
+2026-10-10,P001,entrada,1
+data ruim,P001,entrada,1
+2026-10-10,ZZZ,entrada,1
+2026-10-10,P001,saida,-2
+2026-10-10,P001,saida,0
+2026-10-10,P001,entrada,1.5
+2026-10-10,P001,ajuste,1
+""")
+    resumo = importacao.importar_movimentacoes(db, arquivo)
+
+    assert resumo == {'linhas': 1, 'rejeitadas': 6}
+    assert _movimentacoes(db, "P001") == [("entrada", 1, 150, 151)]
+    assert _movimentacoes(db, "ZZZ") == []
+
+
+def test_datas_em_formatos_diferentes(db):
+    arquivo = _csv("""
+data_hora,codigo_produto,tipo,quantidade
+2026-10-10 14:00:00,P003,entrada,1
+2026-10-11,P003,entrada,1
+2026-10-12T09:15,P003,entrada,1
+""")
+    resumo = importacao.importar_movimentacoes(db, arquivo)
+
+    assert resumo['linhas'] == 3
+
+
+def _indices(db, tabela):
+    conn = sqlite3.connect(db.db_path)
+    nomes = {linha[0] for linha in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type IN ('index', 'trigger') AND tbl_name = ? AND sql IS NOT NULL",
+        (tabela,)
+    )}
+    conn.close()
+    return nomes
+
+
+def test_falha_restaura_indices_e_schema(db):
+    indices = _indices(db, "movimentacoes")
+
+    with pytest.raises(ValueError):
+        importacao.importar_movimentacoes(db, _csv("""
+data_hora,codigo_produto,quantidade
+2026-10-10,P001,1
+"""), adiar_indices=True)
+
+    conn = sqlite3.connect(db.db_path)
+    user_version = conn.execute("PRAGMA user_version").fetchone()[0]
+    conn.close()
+
+    assert indices and _indices(db, "movimentacoes") == indices
+    assert user_version == SCHEMA_VERSAO
+
+
+def test_importacao_pequena_mantem_indices(db):
+    # Um lote pequeno perto da tabela não remove índices nem triggers durante a gravação
+    movimentacoes, produtos = _indices(db, "movimentacoes"), _indices(db, "produtos")
+    durante = []
+
+    def progresso(_resumo):
+        durante.append((_indices(db, "movimentacoes"), _indices(db, "produtos")))
+
+    importacao.importar_movimentacoes(db, _csv("""
+data_hora,codigo_produto,tipo,quantidade
+2026-10-10,P001,entrada,1
+"""), progresso=progresso)
+    importacao.importar_produtos(db, _csv("""
+codigo,nome,categoria
+N001,Chave de fenda,Ferramentas
+"""), progresso=progresso)
+
+    assert durante == [(movimentacoes, produtos)] * 2
+    # Sem reconstrução no final, o índice de busca continua em dia pelos triggers
+    assert list(db.buscar_produtos("fenda")['codigo']) == ["N001"]
+
+
+def test_produtos_inserir_conta_so_os_novos(db):
+    arquivo = _csv("""
+codigo,nome,categoria,estoque_atual,custo_unitario
+P001,Nome novo,Outra,999,1.5
+N001,Chave de fenda,Ferramentas,10,12.5
+N001,Chave repetida,Ferramentas,20,1.0
+,Sem código,Ferramentas,1,1.0
+""")
+    resumo = importacao.importar_produtos(db, arquivo)
+
+    assert resumo == {'linhas': 1, 'rejeitadas': 1, 'ignoradas': 2}
+    produtos = db.obter_produtos().set_index('codigo')
+    assert produtos.loc["P001", "estoque_atual"] == 150
+    assert produtos.loc["N001", "nome"] == "Chave de fenda"
+
+
+def test_produtos_upsert_atualiza_so_colunas_do_arquivo(db):
+    antes = db.obter_produtos().set_index('codigo').loc["P001"]
+
+    resumo = importacao.importar_produtos(db, _csv("""
+codigo,nome,custo_unitario
+P001,Nome novo,1.25
+N001,Chave de fenda,12.5
+"""), modo='upsert')
+
+    assert resumo == {'linhas': 2, 'rejeitadas': 0, 'ignoradas': 0}
+    produtos = db.obter_produtos().set_index('codigo')
+    assert produtos.loc["P001", "nome"] == "Nome novo"
+    assert produtos.loc["P001", "custo_unitario"] == 1.25
+    assert produtos.loc["P001", "estoque_atual"] == antes["estoque_atual"]
+    assert produtos.loc["P001", "categoria"] == antes["categoria"]
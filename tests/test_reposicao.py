@@ -0,0 +1,112 @@
+import sqlite3
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from estoque_db import EstoqueDB
+from multi_deposito import EstoqueMultiDeposito
+from reposicao import MotorReposicao
+
+HOJE = date(2026, 10, 10)
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = EstoqueDB(str(tmp_path / "estoque.db"), dados_iniciais=False)
+    conn = sqlite3.connect(db.db_path)
+    conn.executemany(
+        '''INSERT INTO produtos (codigo, nome, categoria, estoque_atual, estoque_min, estoque_max, custo_unitario)
+           VALUES (?, ?, 'Teste', ?, ?, ?, 2.5)''',
+        [("A", "Com consumo", 100, 10, 200), ("B", "Sem estoque", 0, 5, 50), ("C", "Parado", 40, 10, 80)]
+    )
+    conn.commit()
+    conn.close()
+    return db
+
+
+def _saidas(db, linhas):
+    # (codigo, quantidade, dia, transferencia) gravadas direto, com data controlada
+    conn = sqlite3.connect(db.db_path)
+    conn.executemany(
+        '''INSERT INTO movimentacoes (data_hora, codigo_produto, tipo, quantidade, transferencia)
+           VALUES (?, ?, 'saida', ?, ?)''',
+        [(f"{dia.isoformat()} 12:00:00", codigo, quantidade, transferencia)
+         for codigo, quantidade, dia, transferencia in linhas]
+    )
+    conn.commit()
+    conn.close()
+
+
+def _consumo_completo(db, hoje, janela_dias=3):
+    return MotorReposicao(db, janela_dias=janela_dias).atualizar_consumo(hoje).sort_index()
+
+
+def test_incremental_igual_ao_recalculo(db):
+    motor = MotorReposicao(db, janela_dias=3)
+    _saidas(db, [
+        ("A", 30, HOJE - timedelta(days=3), 0),  # fora da janela de 3 dias
+        ("A", 6, HOJE - timedelta(days=2), 0),
+        ("B", 4, HOJE, 0),
+    ])
+    motor.atualizar_consumo(HOJE)
+
+    _saidas(db, [("A", 3, HOJE, 0), ("C", 9, HOJE, 0), ("A", 50, HOJE, 1)])
+    incremental = motor.atualizar_consumo(HOJE).sort_index()
+
+    pd.testing.assert_series_equal(incremental, _consumo_completo(db, HOJE))
+    assert incremental.to_dict() == {"A": 3.0, "B": 4 / 3, "C": 3.0}
+
+    # Virada do dia: a saída de HOJE - 2 sai da janela
+    amanha = HOJE + timedelta(days=1)
+    pd.testing.assert_series_equal(motor.atualizar_consumo(amanha).sort_index(), _consumo_completo(db, amanha))
+    assert motor.atualizar_consumo(amanha)["A"] == 1.0
+
+
+def test_transferencias_e_estornos_nao_sao_consumo(tmp_path):
+    estoque = EstoqueMultiDeposito(["central", "norte"], str(tmp_path))
+    central = estoque.deposito("central")
+    motor = MotorReposicao(central)
+    antes = motor.atualizar_consumo().get("P001", 0.0)
+
+    estoque.transferir("P001", "central", "norte", 5)
+    central.registrar_movimentacao("P001", "saida", 2, "Estorno", transferencia=True)
+    assert motor.atualizar_consumo().get("P001", 0.0) == antes
+    assert MotorReposicao(central).atualizar_consumo().get("P001", 0.0) == antes
+
+    central.registrar_movimentacao("P001", "saida", 3)
+    assert motor.atualizar_consumo()["P001"] == pytest.approx(antes + 3 / motor.janela_dias)
+    estoque.executor.shutdown()
+
+
+def test_sem_consumo_ou_sem_estoque(db):
+    _saidas(db, [("A", 20, HOJE, 0), ("B", 10, HOJE, 0)])
+
+    resultado = MotorReposicao(db, janela_dias=10).calcular(hoje=HOJE).set_index("codigo")
+
+    # Sem consumo: cobertura indefinida e sem data de ruptura
+    assert np.isnan(resultado.loc["C", "dias_cobertura"])
+    assert pd.isna(resultado.loc["C", "data_ruptura"])
+    assert resultado.loc["C", "sugestao_compra"] == 0
+    # Sem estoque e com consumo: ruptura hoje, pede até o máximo
+    assert resultado.loc["B", "dias_cobertura"] == 0
+    assert resultado.loc["B", "data_ruptura"] == pd.Timestamp(HOJE)
+    assert resultado.loc["B", "sugestao_compra"] == 50
+    assert resultado.loc["B", "custo_sugestao"] == 125.0
+    # 100 unidades a 2 por dia
+    assert resultado.loc["A", "dias_cobertura"] == 50
+    assert resultado.loc["A", "data_ruptura"] == pd.Timestamp(HOJE + timedelta(days=50))
+
+
+def test_sem_estoque_e_sem_consumo(db):
+    conn = sqlite3.connect(db.db_path)
+    conn.execute("UPDATE produtos SET estoque_atual = 0 WHERE codigo = 'C'")
+    conn.commit()
+    conn.close()
+
+    linha = MotorReposicao(db).calcular(hoje=HOJE).set_index("codigo").loc["C"]
+
+    assert np.isnan(linha["dias_cobertura"])
+    assert pd.isna(linha["data_ruptura"])
+    assert linha["sugestao_compra"] == 80